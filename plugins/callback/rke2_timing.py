@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Record how long every play and task takes, for scripts/cluster_sim.py."""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: rke2_timing
+    type: aggregate
+    short_description: Write per-task wall times to a JSON file
+    description:
+        - Records the wall time of every task (from its start to the start of
+          the next one) with its play, role and task file, and the outcome
+          counts per host.
+        - Not enabled by default; scripts/cluster_sim.py enables it.
+    requirements:
+      - enable in configuration
+    options:
+      output:
+        description: JSON file to write when the playbook finishes.
+        default: rke2_timings.json
+        env:
+          - name: RKE2_TIMING_FILE
+        ini:
+          - section: callback_rke2_timing
+            key: output
+'''
+
+import json
+import os
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'rke2_timing'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, *args, **kwargs):
+        super(CallbackModule, self).__init__(*args, **kwargs)
+        self._playbook = None
+        self._play = None
+        self._started = None
+        self._current = None
+        self._tasks = []
+
+    def _finish_task(self):
+        if self._current is not None:
+            self._current['seconds'] = round(time.time() - self._current.pop('_start'), 3)
+            self._tasks.append(self._current)
+            self._current = None
+
+    def _start_task(self, task):
+        self._finish_task()
+        path = task.get_path() or ''
+        if path.startswith(os.getcwd() + os.sep):
+            path = os.path.relpath(path)
+        self._current = {
+            'play': self._play,
+            'name': task.get_name(),
+            'path': path,
+            'role': task._role.get_name() if task._role else None,
+            'hosts': {},
+            '_start': time.time(),
+        }
+
+    def _count(self, outcome):
+        if self._current is not None:
+            self._current['hosts'][outcome] = self._current['hosts'].get(outcome, 0) + 1
+
+    def v2_playbook_on_start(self, playbook):
+        self._playbook = os.path.basename(playbook._file_name)
+        self._started = time.time()
+
+    def v2_playbook_on_play_start(self, play):
+        self._finish_task()
+        self._play = play.get_name()
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._start_task(task)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._start_task(task)
+
+    def v2_runner_on_ok(self, result):
+        self._count('ok')
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._count('ignored' if ignore_errors else 'failed')
+
+    def v2_runner_on_skipped(self, result):
+        self._count('skipped')
+
+    def v2_runner_on_unreachable(self, result):
+        self._count('unreachable')
+
+    def v2_playbook_on_stats(self, stats):
+        self._finish_task()
+        output = self.get_option('output')
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump({
+                'playbook': self._playbook,
+                'started': self._started,
+                'seconds': round(time.time() - self._started, 3) if self._started else 0.0,
+                'tasks': self._tasks,
+            }, f, indent=2)
+            f.write('\n')
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Connection to a simulated RKE2 node served by scripts/cluster_sim.py."""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: rke2_sim
+    short_description: Run tasks against a simulated RKE2 node
+    description:
+        - Nothing is executed. Module calls and shell commands are sent to the
+          scripts/cluster_sim.py state server, which answers them from its
+          simulated cluster and says how long the call takes.
+        - Use the inventory written by scripts/cluster_sim.py.
+    extends_documentation_fragment:
+        - connection_pipelining
+    options:
+      remote_addr:
+        description: Simulated node to talk to.
+        default: inventory_hostname
+        vars:
+          - name: ansible_host
+      sim_url:
+        description: URL of the cluster_sim state server.
+        env:
+          - name: RKE2_SIM_URL
+        vars:
+          - name: rke2_sim_url
+'''
+
+import json
+import os
+import sys
+import time
+
+from ansible.errors import AnsibleConnectionFailure, AnsibleFileNotFound
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.plugins.connection import ConnectionBase
+from ansible.utils.display import Display
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from scripts.cluster_sim import describe_command, internal_response, send_request  # noqa: E402
+
+display = Display()
+
+
+class Connection(ConnectionBase):
+    ''' Simulated RKE2 node '''
+
+    transport = 'rke2_sim'
+    has_pipelining = True
+
+    def __init__(self, *args, **kwargs):
+        super(Connection, self).__init__(*args, **kwargs)
+        # Files transferred during this task (AnsiballZ payloads, rendered templates)
+        self._files = {}
+
+    def _request(self, request):
+        url = self.get_option('sim_url')
+        if not url:
+            raise AnsibleConnectionFailure('RKE2_SIM_URL is not set; run the playbook through scripts/cluster_sim.py')
+        try:
+            response = send_request(url, self.get_option('remote_addr'), request)
+        except (OSError, ValueError) as e:
+            raise AnsibleConnectionFailure('cluster_sim server at %s: %s' % (url, e))
+        if response.get('delay'):
+            time.sleep(response['delay'])
+        return response
+
+    def _connect(self):
+        if not self._connected:
+            display.vvv(u"SIMULATED CONNECTION TO {0}".format(self.get_option('remote_addr')))
+            self._connected = True
+        return self
+
+    def exec_command(self, cmd, in_data=None, sudoable=True):
+        super(Connection, self).exec_command(cmd, in_data=in_data, sudoable=sudoable)
+
+        cmd = to_text(cmd, errors='surrogate_or_strict')
+        internal = internal_response(cmd) if in_data is None else None
+        if internal is not None:
+            rc, stdout, stderr = internal
+            return rc, to_bytes(stdout), to_bytes(stderr)
+
+        request = describe_command(cmd, in_data, self._files)
+        display.vvvv(u"SIM {0}: {1}".format(self.get_option('remote_addr'), request.get('module') or request.get('cmd')))
+        response = self._request(request)
+        if request['type'] == 'module':
+            # Modules print their result as JSON; a failed module exits 1
+            return response.get('rc', 0), to_bytes(json.dumps(response.get('result', {}))), b''
+        return response.get('rc', 0), to_bytes(response.get('stdout', '')), to_bytes(response.get('stderr', ''))
+
+    def put_file(self, in_path, out_path):
+        super(Connection, self).put_file(in_path, out_path)
+        if not os.path.exists(to_bytes(in_path, errors='surrogate_or_strict')):
+            raise AnsibleFileNotFound('file or module does not exist: %s' % in_path)
+        with open(to_bytes(in_path, errors='surrogate_or_strict'), 'rb') as f:
+            self._files[out_path] = to_text(f.read(), errors='surrogate_or_replace')
+        self._request({'type': 'transfer', 'path': out_path})
+
+    def fetch_file(self, in_path, out_path):
+        super(Connection, self).fetch_file(in_path, out_path)
+        response = self._request({'type': 'fetch', 'path': in_path})
+        if response.get('rc'):
+            raise AnsibleFileNotFound(response.get('stderr') or in_path)
+        with open(to_bytes(out_path, errors='surrogate_or_strict'), 'wb') as f:
+            f.write(to_bytes(response.get('content', '')))
+
+    def reset(self):
+        self.close()
+
+    def close(self):
+        self._files = {}
+        self._connected = False
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Filters that build the rke2-cilium HelmChartConfig from inventory vars."""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from scripts.generate_cilium_config import (  # noqa: E402
+    build_cilium_values,
+    render_manifest,
+    unsupported_features,
+)
+
+
+def rke2_cilium_manifest(inventory_vars, node_count=1, kernels=None):
+    return render_manifest(build_cilium_values(inventory_vars, node_count, kernels))
+
+
+class FilterModule(object):
+
+    def filters(self):
+        return {
+            # cilium_settings | rke2_cilium_values(node_count, kernels)
+            'rke2_cilium_values': build_cilium_values,
+            'rke2_cilium_manifest': rke2_cilium_manifest,
+            'rke2_cilium_unsupported': unsupported_features,
+        }
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Filters for semantic RKE2 config drift detection."""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from scripts.config_drift import config_digest, diff_configs  # noqa: E402
+
+
+class FilterModule(object):
+
+    def filters(self):
+        return {
+            # deployed_text | rke2_config_diff(desired_text)
+            'rke2_config_diff': diff_configs,
+            'rke2_config_digest': config_digest,
+        }
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""Filters for pushing rollout durations to the Pushgateway."""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from scripts.push_rollout_metrics import format_metrics, push_url  # noqa: E402
+
+
+class FilterModule(object):
+
+    def filters(self):
+        return {
+            # seconds | rke2_rollout_metrics(finished, result)
+            'rke2_rollout_metrics': format_metrics,
+            # pushgateway_url | rke2_rollout_push_url(node, phase)
+            'rke2_rollout_push_url': push_url,
+        }
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Ansible inventory plugin that reads inventory/hosts.txt directly."""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+    name: rke2_hosts
+    short_description: Build the RKE2 inventory straight from hosts.txt
+    description:
+        - Parses a hosts.txt file with the same code as scripts/generate_inventory.py,
+          so playbooks can use C(-i inventory/hosts.txt) without generating inventory/rke2.yml first.
+        - The parsed result is cached as JSON keyed by the SHA-256 of the file contents
+          and of the parser source, so a changed parser does not serve stale results.
+        - Only files whose name ends in C(hosts.txt) are accepted.
+    options:
+        cache_dir:
+            description: Directory holding parsed inventory cache files.
+            type: path
+            default: ~/.cache/rke2setup/inventory
+            env:
+                - name: RKE2_HOSTS_CACHE_DIR
+            ini:
+                - section: rke2_hosts
+                  key: cache_dir
+        use_cache:
+            description: Reuse a previous parse when the file contents are unchanged.
+            type: bool
+            default: true
+            env:
+                - name: RKE2_HOSTS_USE_CACHE
+            ini:
+                - section: rke2_hosts
+                  key: use_cache
+'''
+
+EXAMPLES = r'''
+# ansible-playbook -i inventory/hosts.txt rke2.yml
+'''
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from ansible.errors import AnsibleParserError
+from ansible.module_utils.common.text.converters import to_native
+from ansible.plugins.inventory import BaseFileInventoryPlugin
+
+# Share the hosts.txt parser with scripts/generate_inventory.py
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import scripts.generate_inventory  # noqa: E402
+from scripts.generate_inventory import generate_inventory_from_lines  # noqa: E402
+
+
+def _parser_digest():
+    """Hash the parser and this plugin, so code changes invalidate the cache."""
+    digest = hashlib.sha256()
+    for path in (scripts.generate_inventory.__file__, __file__):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+PARSER_DIGEST = _parser_digest()
+
+
+class InventoryModule(BaseFileInventoryPlugin):
+
+    NAME = 'rke2_hosts'
+
+    def verify_file(self, path):
+        return super(InventoryModule, self).verify_file(path) and os.path.basename(path).endswith('hosts.txt')
+
+    def _load(self, path):
+        """Return the parsed inventory, using the hash-keyed cache when possible."""
+        with open(path, 'rb') as f:
+            raw = f.read()
+
+        cache_file = None
+        if self.get_option('use_cache'):
+            cache_dir = os.path.expanduser(self.get_option('cache_dir'))
+            cache_key = hashlib.sha256(PARSER_DIGEST.encode() + raw).hexdigest()
+            cache_file = os.path.join(cache_dir, cache_key + '.json')
+            try:
+                with open(cache_file, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+
+        data = generate_inventory_from_lines(raw.decode('utf-8').splitlines())
+
+        if cache_file:
+            try:
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_file), suffix='.tmp')
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, cache_file)
+            except OSError as e:
+                self.display.vvv(f"rke2_hosts: unable to write cache {cache_file}: {to_native(e)}")
+
+        return data
+
+    def _populate_group(self, name, group):
+        """Add a group's hosts, vars and children to the inventory."""
+        group = group or {}
+        for key, value in (group.get('vars') or {}).items():
+            self.inventory.set_variable(name, key, value)
+
+        for hostname, host_vars in (group.get('hosts') or {}).items():
+            self.inventory.add_host(hostname, group=name)
+            for key, value in (host_vars or {}).items():
+                self.inventory.set_variable(hostname, key, value)
+
+        for child_name, child in (group.get('children') or {}).items():
+            self.inventory.add_group(child_name)
+            self.inventory.add_child(name, child_name)
+            self._populate_group(child_name, child)
+
+    def parse(self, inventory, loader, path, cache=True):
+        super(InventoryModule, self).parse(inventory, loader, path, cache)
+        self.set_options()
+
+        try:
+            data = self._load(path)
+        except Exception as e:
+            raise AnsibleParserError(f"Unable to parse {to_native(path)}: {to_native(e)}")
+
+        self._populate_group('all', data.get('all'))
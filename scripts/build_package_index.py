@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Write an apt repository index for a directory of .deb files.
+
+This is a small stand-in for dpkg-scanpackages: it reads each package's
+control stanza, adds the Filename, Size and checksums apt needs, and writes
+Packages, Packages.gz and a JSON summary. With that index the directory can
+be used as a local "deb [trusted=yes] file:<dir> ./" source, so nodes install
+the prerequisite packages without contacting any repository.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def dpkg_control(path):
+    """Return the control stanza of a .deb file as text."""
+    result = subprocess.run(['dpkg-deb', '-f', path], capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def parse_control(text):
+    """Parse a control stanza into an ordered dict, keeping multi-line values."""
+    fields = {}
+    current = None
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if line[0] in ' \t' and current:
+            fields[current] += '\n' + line
+        elif ':' in line:
+            current, value = line.split(':', 1)
+            fields[current] = value.strip()
+    return fields
+
+
+def file_digests(path):
+    """Return (size, md5, sha256) of a file, read in chunks."""
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            md5.update(chunk)
+            sha256.update(chunk)
+            size += len(chunk)
+    return size, md5.hexdigest(), sha256.hexdigest()
+
+
+def build_index(directory, read_control=dpkg_control):
+    """Return one control dict per .deb in directory, sorted by package name."""
+    entries = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.deb'):
+            continue
+        path = os.path.join(directory, name)
+        fields = parse_control(read_control(path))
+        if 'Package' not in fields:
+            raise ValueError(f"{name}: control data has no Package field")
+        size, md5, sha256 = file_digests(path)
+        fields.update({
+            'Filename': f"./{name}",
+            'Size': str(size),
+            'MD5sum': md5,
+            'SHA256': sha256,
+        })
+        entries.append(fields)
+    return sorted(entries, key=lambda e: (e['Package'], e.get('Version', '')))
+
+
+def format_packages(entries):
+    """Return the Packages file content for a list of control dicts."""
+    stanzas = ['\n'.join(f"{key}: {value}" for key, value in entry.items()) for entry in entries]
+    return '\n\n'.join(stanzas) + '\n' if stanzas else ''
+
+
+def missing_packages(entries, requested):
+    """Return requested package names that no .deb in the index provides."""
+    provided = set()
+    for entry in entries:
+        provided.add(entry['Package'])
+        for item in entry.get('Provides', '').split(','):
+            if item.strip():
+                provided.add(item.split('(')[0].strip())
+    return sorted(set(requested or []) - provided)
+
+
+def write_index(directory, entries, requested=None):
+    """Write Packages, Packages.gz and index.json into directory; return the summary."""
+    content = format_packages(entries).encode()
+    with open(os.path.join(directory, 'Packages'), 'wb') as f:
+        f.write(content)
+    with gzip.open(os.path.join(directory, 'Packages.gz'), 'wb') as f:
+        f.write(content)
+
+    summary = {
+        'requested': sorted(requested or []),
+        'missing': missing_packages(entries, requested),
+        'total_size': sum(int(e['Size']) for e in entries),
+        'packages': [
+            {
+                'package': e['Package'],
+                'version': e.get('Version', ''),
+                'architecture': e.get('Architecture', ''),
+                'filename': e['Filename'][2:],
+                'size': int(e['Size']),
+                'sha256': e['SHA256'],
+            }
+            for e in entries
+        ],
+    }
+    with open(os.path.join(directory, 'index.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Write Packages, Packages.gz and index.json for a directory of .deb files.'
+    )
+    parser.add_argument('directory', help='Directory holding the downloaded .deb files')
+    parser.add_argument(
+        '-p', '--package',
+        action='append',
+        default=[],
+        help='Package that must be in the bundle (repeatable)'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        entries = build_index(args.directory)
+        summary = write_index(args.directory, entries, args.package)
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    print(f"Indexed {len(entries)} packages ({summary['total_size'] // 1024} KiB) in {args.directory}")
+    if summary['missing']:
+        print(f"Error: requested packages missing from bundle: {', '.join(summary['missing'])}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1255 @@
+#!/usr/bin/env python3
+"""Run the playbooks against a simulated cluster and report where the time goes.
+
+    python3 scripts/cluster_sim.py rke2.yml -n 50
+    python3 scripts/cluster_sim.py rke2.yml update-rke2.yml rebuild_node.yml -n 20 -o report.json
+
+No machines are involved. The generated inventory points every host at the
+rke2_sim connection plugin (plugins/connection), which forwards each module
+call and shell command to a state server in this process instead of running
+it. The server keeps one shared view of the cluster: installed files, running
+services, registered and Ready nodes and etcd members. It answers the role's
+kubectl, etcdctl and systemctl calls from that state, with latencies and
+failure rates taken from a profile (DEFAULT_PROFILE, overridable with
+--profile). Simulated time runs --time-scale times faster than wall time on
+the node side. The controller side (retry delays, pause, forks) is real, so
+scheduling and polling changes show up in the wall time as they would
+against a real cluster.
+
+Per-play and per-task-file (phase) timings come from the rke2_timing
+callback (plugins/callback). Commands the simulator does not recognise
+succeed with no output.
+"""
+
+import argparse
+import ast
+import base64
+import copy
+import hashlib
+import json
+import os
+import posixpath
+import random
+import re
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import Request, urlopen
+
+import yaml
+
+try:
+    from scripts.fsync_bench import evaluate, parse_args as parse_fsync_args, summarize
+    from scripts.generate_inventory import generate_inventory_from_lines, write_inventory_file
+except ImportError:
+    from fsync_bench import evaluate, parse_args as parse_fsync_args, summarize
+    from generate_inventory import generate_inventory_from_lines, write_inventory_file
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PROFILE = {
+    # Wall seconds per simulated second on the node side
+    'time_scale': 0.1,
+    # Simulated seconds per operation, +/- jitter (fraction), and the chance
+    # that the operation fails without changing anything
+    'operations': {
+        'kubectl': {'latency': 0.3, 'jitter': 0.3, 'failure_rate': 0.0},
+        'etcdctl': {'latency': 0.2, 'jitter': 0.3, 'failure_rate': 0.0},
+        'systemctl': {'latency': 0.2, 'jitter': 0.3, 'failure_rate': 0.0},
+        'drain': {'latency': 20.0, 'jitter': 0.5, 'failure_rate': 0.0},
+        'install': {'latency': 25.0, 'jitter': 0.3, 'failure_rate': 0.0},
+        'uninstall': {'latency': 15.0, 'jitter': 0.3, 'failure_rate': 0.0},
+        'facts': {'latency': 1.5, 'jitter': 0.3, 'failure_rate': 0.0},
+        'module': {'latency': 0.2, 'jitter': 0.3, 'failure_rate': 0.0},
+        'shell': {'latency': 0.1, 'jitter': 0.3, 'failure_rate': 0.0},
+        'transfer': {'latency': 0.1, 'jitter': 0.3, 'failure_rate': 0.0},
+    },
+    # Simulated seconds from 'systemctl start' until the unit is up (start
+    # blocks that long, as with Type=notify) and from then until Ready
+    'startup': {
+        'rke2-server': 30.0,
+        'rke2-agent': 15.0,
+        'node_ready': 20.0,
+    },
+    # Mean WAL fdatasync latency reported to fsync_bench.py
+    'fsync_ms': 1.0,
+    'facts': {
+        'architecture': 'x86_64',
+        'distribution': 'Ubuntu',
+        'distribution_release': 'noble',
+        'distribution_version': '24.04',
+        'kernel': '6.8.0-45-generic',
+        'memtotal_mb': 16384,
+        'processor_vcpus': 8,
+        'root_size_available': 100 * 1024 ** 3,
+    },
+}
+
+RKE2_SERVICES = ('rke2-server', 'rke2-agent')
+RKE2_FILES = (
+    '/usr/local/bin/rke2',
+    '/usr/local/bin/rke2-killall.sh',
+    '/usr/local/bin/rke2-uninstall.sh',
+    '/usr/local/lib/systemd/system/rke2-server.service',
+    '/usr/local/lib/systemd/system/rke2-agent.service',
+)
+SERVER_FILES = (
+    '/var/lib/rancher/rke2/bin/kubectl',
+    '/etc/rancher/rke2/rke2.yaml',
+)
+# Paths that exist on any node before anything is installed
+BASE_PATHS = ('/', '/etc', '/home', '/root', '/tmp', '/usr', '/usr/local', '/usr/local/bin', '/var', '/var/lib')
+BASE_FILES = {
+    '/etc/sudoers': 'Defaults\tsecure_path="/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin"\n',
+}
+CONTROL_PLANE_PODS = ('etcd', 'kube-apiserver', 'kube-controller-manager', 'kube-scheduler',
+                      'cloud-controller-manager')
+NODE_PODS = ('rke2-cilium', 'kube-proxy')
+
+# What the get.rke2.io installer prints; verify_installation.yml checks for it
+INSTALL_OUTPUT = ('[INFO]  finding release for channel stable\n'
+                  '[INFO]  downloading tarball\n'
+                  '[INFO]  verifying tarball\n'
+                  '[INFO]  unpacking tarball file to /usr/local\n')
+API_REFUSED = 'The connection to the server 127.0.0.1:6443 was refused - did you specify the right host or port?'
+# Heaviest first: a script containing several operations is accounted as the first match
+SCRIPT_KINDS = (
+    ('install', re.compile(r'get\.rke2\.io|(^|[/\s])(rke2-)?install\.sh')),
+    ('uninstall', re.compile(r'rke2-uninstall\.sh|rke2-killall\.sh')),
+    ('drain', re.compile(r'\bkubectl\b.*\bdrain\b')),
+    ('etcdctl', re.compile(r'\betcdctl\b')),
+    ('kubectl', re.compile(r'\bkubectl\b')),
+    ('systemctl', re.compile(r'\bsystemctl\b')),
+)
+MODULE_KINDS = {
+    'gather_facts': 'facts',
+    'setup': 'facts',
+    'service': 'systemctl',
+    'systemd': 'systemctl',
+    'systemd_service': 'systemctl',
+}
+_COMPLEX_SHELL = re.compile(r'\$\(|`|\b(if|while|for|until|case)\b|[^&]&\s*$', re.M)
+_PARAMS_RE = re.compile(r'^\s*ANSIBALLZ_PARAMS = (.+)$', re.M)
+_MODULE_FQN_RE = re.compile(r"mod_name='([\w.]+)'")
+_PAYLOAD_PATH_RE = re.compile(r'(\S+/AnsiballZ_\w+\.py)')
+_TMPDIR_RE = re.compile(r'echo (ansible-tmp-[\w.-]+)="` echo (\S+?) `"')
+
+
+def merge_profile(overrides, base=None):
+    """Return base (DEFAULT_PROFILE) with the nested overrides applied."""
+    merged = copy.deepcopy(DEFAULT_PROFILE if base is None else base)
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_profile(value, merged[key])
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_profile(path=None):
+    """Load a YAML or JSON profile file over DEFAULT_PROFILE."""
+    if not path:
+        return merge_profile({})
+    with open(path, 'r') as f:
+        return merge_profile(yaml.safe_load(f) or {})
+
+
+def parse_module_payload(payload):
+    """Return (module name, args) from an AnsiballZ wrapper, or None if it is not one."""
+    if isinstance(payload, bytes):
+        payload = payload.decode('utf-8', 'replace')
+    params = _PARAMS_RE.search(payload)
+    module = _MODULE_FQN_RE.search(payload)
+    if not params or not module:
+        return None
+    args = json.loads(ast.literal_eval(params.group(1))).get('ANSIBLE_MODULE_ARGS', {})
+    args = {key: value for key, value in args.items() if not key.startswith('_ansible_')}
+    return module.group(1).rsplit('.', 1)[-1], args
+
+
+def unwrap_command(cmd):
+    """Strip the sh -c, become and '&& sleep 0' wrappers Ansible puts around a command."""
+    while True:
+        try:
+            words = shlex.split(cmd)
+        except ValueError:
+            break
+        if '-c' not in words:
+            break
+        index = words.index('-c')
+        if index == 0 or index + 1 >= len(words) or posixpath.basename(words[index - 1]) not in ('sh', 'bash'):
+            break
+        cmd = words[index + 1]
+    cmd = re.sub(r'^echo BECOME-SUCCESS-\w+ ;\s*', '', cmd.strip())
+    return re.sub(r'\s*&& sleep 0$', '', cmd).strip()
+
+
+def internal_response(cmd, home='/root'):
+    """Answer the housekeeping commands Ansible runs around modules, or return None.
+
+    These are not operations on the cluster, so they take no simulated time.
+    """
+    tmpdir = _TMPDIR_RE.search(cmd)
+    if tmpdir:
+        path = tmpdir.group(2).replace('~', home, 1)
+        return 0, f"{tmpdir.group(1)}={path}\n", ''
+    command = unwrap_command(cmd)
+    if re.match(r'^echo ~\S*$', command):
+        return 0, home + '\n', ''
+    if re.match(r'^(chmod|chown|setfacl|rm|mkdir|umask)\b', command):
+        return 0, '', ''
+    return None
+
+
+def describe_command(cmd, in_data=None, files=None):
+    """Turn what the connection plugin receives into a request for the state server.
+
+    Modules arrive either piped (in_data) or as a transferred AnsiballZ file
+    named on the command line; files maps transferred remote paths to their
+    content. Everything else is a shell command.
+    """
+    files = files or {}
+    module = parse_module_payload(in_data) if in_data else None
+    if module is None:
+        path = _PAYLOAD_PATH_RE.search(cmd)
+        if path and path.group(1) in files:
+            module = parse_module_payload(files[path.group(1)])
+    if module is None:
+        return {'type': 'command', 'cmd': unwrap_command(cmd)}
+
+    name, args = module
+    request = {'type': 'module', 'module': name, 'args': args}
+    if args.get('src') in files:
+        # copy/template transfer the rendered file first; keep it so slurp,
+        # cat and grep can read it back later
+        content = files[args['src']]
+        request['content'] = content.decode('utf-8', 'replace') if isinstance(content, bytes) else content
+    return request
+
+
+def classify_script(script):
+    """Return the operation kind a shell script is accounted as."""
+    for kind, pattern in SCRIPT_KINDS:
+        if pattern.search(script):
+            return kind
+    if 'fsync_bench.py' in script:
+        return 'module'
+    return 'shell'
+
+
+def _split_statements(script):
+    """Split a simple shell script into [(operator, [pipeline stage argv, ...])]."""
+    script = re.sub(r'^\s*#.*$', '', script.replace('\\\n', ' '), flags=re.M)
+    lexer = shlex.shlex(script, posix=True, punctuation_chars=';&|<>\n')
+    lexer.whitespace = ' \t\r'
+    lexer.whitespace_split = True
+    lexer.commenters = ''
+    statements, stages, argv, operator = [], [], [], ';'
+    for token in list(lexer) + ['\n']:
+        if token == '|':
+            stages.append(argv)
+            argv = []
+        elif token in ('&&', '||') or set(token) <= set(';\n'):
+            if argv:
+                stages.append(argv)
+            if stages:
+                statements.append((operator, stages))
+            stages, argv = [], []
+            operator = token if token in ('&&', '||') else ';'
+        else:
+            argv.append(token)
+    return statements
+
+
+def _strip_assignments(argv):
+    """Drop leading VAR=value words and return (env, remaining argv)."""
+    env = {}
+    while argv and re.match(r'^[A-Za-z_]\w*=', argv[0]):
+        key, value = argv[0].split('=', 1)
+        env[key] = value
+        argv = argv[1:]
+    if argv and argv[0] == 'export':
+        for word in argv[1:]:
+            if '=' in word:
+                key, value = word.split('=', 1)
+                env[key] = value
+        argv = []
+    return env, argv
+
+
+def _redirects(argv):
+    """Split redirections out of argv; return (argv, input file or None)."""
+    words, stdin_path, skip = [], None, False
+    for index, word in enumerate(argv):
+        if skip:
+            skip = False
+            continue
+        if word in ('<', '>', '>>'):
+            if word == '<' and index + 1 < len(argv):
+                stdin_path = argv[index + 1]
+            skip = True
+        elif word.isdigit() and index + 1 < len(argv) and argv[index + 1] in ('>', '>>'):
+            continue
+        elif word.startswith('>&') or word in ('&',):
+            continue
+        else:
+            words.append(word)
+    return words, stdin_path
+
+
+def _option_value(argv, *names):
+    """Return the value of --name=value / --name value / -n value in argv."""
+    for index, word in enumerate(argv):
+        for name in names:
+            if word == name and index + 1 < len(argv):
+                return argv[index + 1]
+            if word.startswith(name + '=') or (len(name) == 2 and word.startswith(name) and len(word) > 2):
+                return word[len(name):].lstrip('=')
+    return None
+
+
+def text_filter(argv, text):
+    """Apply a standard text utility (grep, awk, cut, ...) to text; return (rc, output)."""
+    name = posixpath.basename(argv[0])
+    args = argv[1:]
+    lines = text.splitlines()
+
+    if name == 'grep':
+        flags = ''.join(word[1:] for word in args if word.startswith('-') and len(word) > 1)
+        patterns = [word for word in args if not word.startswith('-') or word == '-']
+        if not patterns:
+            return 2, ''
+        regex = re.compile(patterns[0], re.I if 'i' in flags else 0)
+        matched = [line for line in lines if bool(regex.search(line)) != ('v' in flags)]
+        rc = 0 if matched else 1
+        if 'q' in flags:
+            return rc, ''
+        if 'c' in flags:
+            return rc, f"{len(matched)}\n"
+        return rc, ''.join(line + '\n' for line in matched)
+    if name == 'awk':
+        field = re.search(r'print \$(\d+)', ' '.join(args))
+        if not field:
+            return 0, text
+        index = int(field.group(1))
+        rows = [(line.split() + [''] * index)[index - 1] if index else line for line in lines]
+        return 0, ''.join(row + '\n' for row in rows)
+    if name == 'cut':
+        delimiter = _option_value(args, '-d') or '\t'
+        field = int((_option_value(args, '-f') or '1').split(',')[0].split('-')[0])
+        return 0, ''.join((line.split(delimiter) + [''] * field)[field - 1] + '\n' for line in lines)
+    if name == 'tr':
+        words = [word for word in args if not word.startswith('-')]
+        if len(words) == 2:
+            source, target = (word.encode().decode('unicode_escape') for word in words)
+            return 0, text.translate(str.maketrans(source, target[:len(source)].ljust(len(source), target[-1:])))
+        return 0, text
+    if name in ('head', 'tail'):
+        chars = _option_value(args, '-c')
+        if chars:
+            return 0, text[:int(chars)] if name == 'head' else text[-int(chars):]
+        count = int(_option_value(args, '-n') or next((w[1:] for w in args if re.match(r'^-\d+$', w)), 10))
+        selected = lines[:count] if name == 'head' else lines[-count:]
+        return 0, ''.join(line + '\n' for line in selected)
+    if name == 'wc':
+        return 0, f"{len(lines)}\n"
+    if name == 'sort':
+        return 0, ''.join(line + '\n' for line in sorted(lines))
+    if name in ('column', 'cat', 'tee', 'uniq'):
+        return 0, text
+    if name == 'true':
+        return 0, ''
+    if name == 'false':
+        return 1, ''
+    return None
+
+
+def jsonpath_value(expression, values):
+    """Fill each {...} of a kubectl jsonpath template from values, '' if unknown."""
+    def replace(match):
+        field = match.group(1)
+        for key, value in values.items():
+            if key in field:
+                return value
+        return ''
+    return re.sub(r'\{([^{}]*)\}', replace, expression)
+
+
+def member_id(name):
+    """Return a stable etcd member ID for a node name."""
+    return hashlib.sha1(name.encode()).hexdigest()[:16]
+
+
+class ClusterState(object):
+    """Shared state of the simulated cluster, answering requests from the connection plugin."""
+
+    def __init__(self, profile=None, seed=None, clock=time.monotonic):
+        self.profile = profile or merge_profile({})
+        self.scale = float(self.profile.get('time_scale', 1.0))
+        self.random = random.Random(seed)
+        self.clock = clock
+        self.nodes = {}
+        self.aliases = {}
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    # -- nodes -------------------------------------------------------------
+
+    def add_node(self, name, address=None, control_plane=False):
+        """Register an inventory host; address is its ansible_host."""
+        self.nodes[name] = {
+            'name': name,
+            'address': address or name,
+            'control_plane': control_plane,
+            'files': dict({path: None for path in BASE_PATHS}, **BASE_FILES),
+            'services': {},
+            'registered_at': None,
+            'ready_at': None,
+            'cordoned': False,
+            'etcd_member': False,
+        }
+        self.aliases[address or name] = name
+        return self.nodes[name]
+
+    def node(self, host):
+        """Return the node for an inventory name or address, adding unknown hosts."""
+        name = self.aliases.get(host, host)
+        return self.nodes.get(name) or self.add_node(name)
+
+    def _up(self, node, service):
+        started = node['services'].get(service)
+        return started is not None and self.clock() >= started
+
+    def _registered(self, node):
+        return node['registered_at'] is not None and self.clock() >= node['registered_at']
+
+    def _ready(self, node):
+        return node['ready_at'] is not None and self.clock() >= node['ready_at']
+
+    def _registered_nodes(self):
+        return [node for node in self.nodes.values() if self._registered(node)]
+
+    def _members(self):
+        return [node for node in self.nodes.values() if node['etcd_member']]
+
+    def _quorum(self):
+        members = self._members()
+        healthy = [node for node in members if self._up(node, 'rke2-server')]
+        return bool(members) and len(healthy) * 2 > len(members)
+
+    def snapshot(self):
+        """Return node counts for the report."""
+        return {
+            'nodes': len(self.nodes),
+            'registered': len(self._registered_nodes()),
+            'ready': len([node for node in self.nodes.values() if self._ready(node)]),
+            'etcd_members': len(self._members()),
+        }
+
+    # -- requests ----------------------------------------------------------
+
+    def handle(self, host, request):
+        """Answer one request; the response carries the wall seconds the caller should wait."""
+        with self._lock:
+            node = self.node(host)
+            kind, response, wait = self._dispatch(node, request)
+            delay = (self._latency(kind) + wait) * self.scale
+            failed = response.get('rc', 0) != 0 or response.get('result', {}).get('failed', False)
+            entry = self.stats.setdefault(kind, {'count': 0, 'failed': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            entry['count'] += 1
+            entry['failed'] += int(bool(failed))
+            entry['seconds'] = round(entry['seconds'] + delay, 6)
+            entry['max_seconds'] = round(max(entry['max_seconds'], delay), 6)
+        response['delay'] = round(delay, 6)
+        return response
+
+    def _latency(self, kind):
+        settings = self.profile['operations'].get(kind, self.profile['operations']['module'])
+        jitter = settings.get('jitter', 0.0)
+        return max(0.0, settings.get('latency', 0.0) * (1 + jitter * self.random.uniform(-1, 1)))
+
+    def _inject_failure(self, kind):
+        settings = self.profile['operations'].get(kind, {})
+        return self.random.random() < settings.get('failure_rate', 0.0)
+
+    def _dispatch(self, node, request):
+        """Return (kind, response, extra simulated seconds)."""
+        request_type = request.get('type')
+        if request_type == 'transfer':
+            # Only temporary files are transferred; modules record what they install
+            return 'transfer', {'rc': 0}, 0.0
+        if request_type == 'fetch':
+            content = node['files'].get(request['path'])
+            if request['path'] not in node['files']:
+                return 'transfer', {'rc': 1, 'stderr': f"{request['path']}: No such file or directory"}, 0.0
+            return 'transfer', {'rc': 0, 'content': content or ''}, 0.0
+        if request_type == 'module':
+            module, args = request['module'], request.get('args', {})
+            if module == 'command':
+                kind = classify_script(args.get('_raw_params') or ' '.join(args.get('argv') or []))
+            else:
+                kind = MODULE_KINDS.get(module, 'module')
+            if self._inject_failure(kind):
+                return kind, {'rc': 1, 'result': {'failed': True, 'rc': 1, 'msg': f"simulated {kind} failure"}}, 0.0
+            result, wait = self.run_module(node, module, args, request.get('content'))
+            return kind, {'rc': 1 if result.get('failed') else 0, 'result': result}, wait
+        script = request.get('cmd', '')
+        kind = classify_script(script)
+        if self._inject_failure(kind):
+            return kind, {'rc': 1, 'stdout': '', 'stderr': f"simulated {kind} failure"}, 0.0
+        rc, stdout, stderr, wait = self.run_script(node, script)
+        return kind, {'rc': rc, 'stdout': stdout, 'stderr': stderr}, wait
+
+    # -- modules -----------------------------------------------------------
+
+    def run_module(self, node, module, args, content=None):
+        """Run a module against node; return (result dict, extra simulated seconds)."""
+        if module == 'command':
+            return self._module_command(node, args)
+        if module in ('setup', 'gather_facts'):
+            return {'ansible_facts': self.facts(node), 'changed': False}, 0.0
+        if module in MODULE_KINDS:
+            return self._module_service(node, args)
+        if module == 'stat':
+            path = args.get('path', '')
+            exists = path in node['files']
+            stat = {'exists': exists}
+            if exists:
+                stat.update({'path': path, 'isdir': node['files'][path] is None, 'isreg': node['files'][path] is not None,
+                             'mode': '0644', 'checksum': hashlib.sha1((node['files'][path] or '').encode()).hexdigest()})
+            return {'changed': False, 'stat': stat}, 0.0
+        if module == 'slurp':
+            path = args.get('src') or args.get('path', '')
+            if path not in node['files']:
+                return {'failed': True, 'msg': f"file not found: {path}"}, 0.0
+            encoded = base64.b64encode((node['files'][path] or '').encode()).decode()
+            return {'changed': False, 'content': encoded, 'encoding': 'base64', 'source': path}, 0.0
+        if module == 'wait_for':
+            return self._module_wait_for(node, args)
+        if module == 'find':
+            return self._module_find(node, args)
+        if module == 'tempfile':
+            path = f"/tmp/ansible.{self.random.randrange(16 ** 8):08x}{args.get('suffix') or ''}"
+            node['files'][path] = None if args.get('state') == 'directory' else ''
+            return {'changed': True, 'path': path, 'state': args.get('state') or 'file'}, 0.0
+        if module == 'uri':
+            return {'changed': False, 'status': 200, 'url': args.get('url'), 'msg': 'OK (simulated)'}, 0.0
+        if module == 'ping':
+            return {'changed': False, 'ping': 'pong'}, 0.0
+
+        # file, copy, template, get_url, unarchive, lineinfile, apt, ...
+        path = args.get('dest') or args.get('path') or args.get('name')
+        if isinstance(path, str) and path.startswith('/'):
+            if args.get('state') == 'absent':
+                for known in [known for known in node['files'] if known == path or known.startswith(path + '/')]:
+                    del node['files'][known]
+            elif args.get('state') == 'directory':
+                node['files'][path] = None
+            elif module in ('copy', 'template') and args.get('remote_src') and args.get('src') in node['files']:
+                node['files'][path] = node['files'][args['src']]
+            else:
+                node['files'][path] = content if content is not None else node['files'].get(path, '')
+        return {'changed': True, 'dest': path}, 0.0
+
+    def _module_command(self, node, args):
+        script = args.get('_raw_params') or ' '.join(shlex.quote(word) for word in args.get('argv') or [])
+        if args.get('creates') and args['creates'] in node['files']:
+            return {'changed': False, 'rc': 0, 'stdout': f"skipped, since {args['creates']} exists",
+                    'stderr': '', 'cmd': script}, 0.0
+        if args.get('removes') and args['removes'] not in node['files']:
+            return {'changed': False, 'rc': 0, 'stdout': f"skipped, since {args['removes']} does not exist",
+                    'stderr': '', 'cmd': script}, 0.0
+        rc, stdout, stderr, wait = self.run_script(node, script)
+        result = {'changed': True, 'rc': rc, 'stdout': stdout.rstrip('\n'), 'stderr': stderr.rstrip('\n'),
+                  'cmd': script}
+        if rc != 0:
+            result.update({'failed': True, 'msg': 'non-zero return code'})
+        return result, wait
+
+    def _module_service(self, node, args):
+        name = args.get('name') or ''
+        name = name[:-len('.service')] if name.endswith('.service') else name
+        state = args.get('state')
+        wait, error = 0.0, None
+        if state == 'started':
+            wait, error = self.start_service(node, name)
+        elif state in ('restarted', 'reloaded'):
+            wait, error = self.start_service(node, name, restart=True)
+        elif state == 'stopped':
+            self.stop_service(node, name)
+        if error:
+            return {'failed': True, 'name': name, 'msg': error}, wait
+        active = name in node['services'] or name not in RKE2_SERVICES
+        return {
+            'changed': state is not None,
+            'name': name,
+            'state': state,
+            'enabled': bool(args.get('enabled')),
+            'status': {'ActiveState': 'active' if active else 'inactive',
+                       'SubState': 'running' if active else 'dead'},
+        }, wait
+
+    def _module_wait_for(self, node, args):
+        timeout = float(args.get('timeout') or 300)
+        delay = float(args.get('delay') or 0)
+        if args.get('port'):
+            target = node
+            host = args.get('host') or '127.0.0.1'
+            if host not in ('127.0.0.1', 'localhost', '0.0.0.0'):
+                target = self.node(host)
+            if int(args['port']) not in (6443, 9345):
+                return {'changed': False, 'elapsed': delay, 'port': args['port']}, delay
+            started = target['services'].get('rke2-server')
+            if started is None:
+                return {'failed': True, 'elapsed': timeout,
+                        'msg': f"Timeout when waiting for {host}:{args['port']}"}, timeout
+            wait = max(delay, (started - self.clock()) / self.scale if self.scale else 0.0)
+            return {'changed': False, 'elapsed': wait, 'port': args['port']}, min(wait, timeout)
+        if args.get('path'):
+            state = args.get('state') or 'present'
+            if (args['path'] in node['files']) != (state == 'absent'):
+                return {'changed': False, 'elapsed': delay, 'path': args['path']}, delay
+            return {'failed': True, 'elapsed': timeout, 'msg': f"Timeout when waiting for file {args['path']}"}, timeout
+        # No condition: wait_for only sleeps
+        return {'changed': False, 'elapsed': timeout}, timeout
+
+    def _module_find(self, node, args):
+        roots = args.get('paths') or []
+        roots = [roots] if isinstance(roots, str) else roots
+        excludes = args.get('excludes') or []
+        excludes = [excludes] if isinstance(excludes, str) else excludes
+        files = [
+            {'path': path, 'isdir': content is None}
+            for path, content in sorted(node['files'].items())
+            for root in roots
+            if posixpath.dirname(path) == root.rstrip('/') and posixpath.basename(path) not in excludes
+        ]
+        return {'changed': False, 'files': files, 'matched': len(files), 'examined': len(files)}, 0.0
+
+    def facts(self, node):
+        """Return setup facts for node from the profile."""
+        facts = self.profile['facts']
+        index = list(self.nodes).index(node['name'])
+        address = node['address'] if re.match(r'^\d+\.\d+\.\d+\.\d+$', node['address']) else \
+            f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256 + 1}"
+        now = time.gmtime()
+        return {
+            'ansible_hostname': node['name'],
+            'ansible_fqdn': node['name'],
+            'ansible_nodename': node['name'],
+            'ansible_architecture': facts['architecture'],
+            'ansible_machine': facts['architecture'],
+            'ansible_kernel': facts['kernel'],
+            'ansible_system': 'Linux',
+            'ansible_os_family': 'Debian',
+            'ansible_distribution': facts['distribution'],
+            'ansible_distribution_release': facts['distribution_release'],
+            'ansible_distribution_version': facts['distribution_version'],
+            'ansible_distribution_major_version': facts['distribution_version'].split('.')[0],
+            'ansible_pkg_mgr': 'apt',
+            'ansible_service_mgr': 'systemd',
+            'ansible_processor_vcpus': facts['processor_vcpus'],
+            'ansible_processor_cores': facts['processor_vcpus'],
+            'ansible_memtotal_mb': facts['memtotal_mb'],
+            'ansible_default_ipv4': {'address': address, 'interface': 'eth0'},
+            'ansible_all_ipv4_addresses': [address],
+            'ansible_mounts': [{'mount': '/', 'device': '/dev/sda1', 'fstype': 'ext4',
+                                'size_total': facts['root_size_available'] * 2,
+                                'size_available': facts['root_size_available']}],
+            'ansible_date_time': {'iso8601': time.strftime('%Y-%m-%dT%H:%M:%SZ', now),
+                                  'epoch': str(int(time.time())), 'date': time.strftime('%Y-%m-%d', now)},
+            'ansible_user_id': 'root',
+            'ansible_python': {'executable': '/usr/bin/python3', 'version': {'major': 3, 'minor': 12}},
+        }
+
+    # -- services ----------------------------------------------------------
+
+    def start_service(self, node, name, restart=False):
+        """Start (or restart) a unit; return (simulated seconds until it is up, error)."""
+        if name in node['services'] and not restart:
+            return 0.0, None
+        if name not in RKE2_SERVICES:
+            node['services'][name] = self.clock()
+            return 0.0, None
+        if '/usr/local/bin/rke2' not in node['files']:
+            return 0.0, f"Unit {name}.service not found."
+        startup = self.profile['startup']
+        wait = float(startup.get(name, 0.0))
+        up = self.clock() + wait * self.scale
+        node['services'][name] = up
+        node['registered_at'] = up
+        node['ready_at'] = up + float(startup.get('node_ready', 0.0)) * self.scale
+        if name == 'rke2-server':
+            node['etcd_member'] = True
+            for path in SERVER_FILES:
+                node['files'].setdefault(path, 'apiVersion: v1\nkind: Config\n')
+        return wait, None
+
+    def stop_service(self, node, name):
+        if node['services'].pop(name, None) is not None and name in RKE2_SERVICES:
+            node['ready_at'] = None
+
+    def install(self, node):
+        for path in RKE2_FILES:
+            node['files'].setdefault(path, '')
+
+    def uninstall(self, node):
+        for name in RKE2_SERVICES:
+            self.stop_service(node, name)
+        for path in list(node['files']):
+            if path in RKE2_FILES or path.startswith(('/var/lib/rancher/', '/etc/rancher/')):
+                del node['files'][path]
+
+    # -- shell -------------------------------------------------------------
+
+    def run_script(self, node, script):
+        """Run a shell script on node; return (rc, stdout, stderr, extra simulated seconds).
+
+        Pipelines of known commands are evaluated. Scripts with control flow
+        or command substitution only apply the main operation they contain.
+        """
+        if _COMPLEX_SHELL.search(script):
+            return self._complex_script(node, script)
+        pipefail = 'pipefail' in script
+        errexit = re.search(r'^\s*set -\w*e', script, re.M) is not None
+        rc, stdout, stderr, wait = 0, '', '', 0.0
+        for operator, stages in _split_statements(script):
+            if (operator == '&&' and rc != 0) or (operator == '||' and rc == 0):
+                continue
+            rc, out, err, extra = self._run_pipeline(node, stages, pipefail, script)
+            stdout += out
+            stderr += err
+            wait += extra
+            if rc != 0 and errexit:
+                break
+        return rc, stdout, stderr, wait
+
+    def _complex_script(self, node, script):
+        kind = classify_script(script)
+        if kind == 'install':
+            self.install(node)
+            return 0, INSTALL_OUTPUT, '', 0.0
+        if kind == 'uninstall':
+            self.uninstall(node)
+            return 0, '', '', 0.0
+        if kind == 'drain':
+            target = re.search(r'drain\s+"?([\w.$-]+)', script).group(1)
+            if target.startswith('$'):
+                assigned = re.search(r'%s="?([\w.-]+)' % re.escape(target[1:].strip('{}')), script)
+                target = assigned.group(1) if assigned else target
+            rc, stdout, stderr = self.kubectl(node, ['drain', target])
+            return rc, stdout, stderr, 0.0
+        return 0, '', '', 0.0
+
+    def _run_pipeline(self, node, stages, pipefail, script):
+        rc, text, stderr, wait, failures = 0, '', '', 0.0, []
+        for argv in stages:
+            env, argv = _strip_assignments(argv)
+            argv, stdin_path = _redirects(argv)
+            if not argv:
+                continue
+            rc, text, err, extra = self._run_stage(node, argv, text, stdin_path, env)
+            stderr += err
+            wait += extra
+            failures.append(rc)
+        if pipefail:
+            rc = next((code for code in failures if code != 0), 0)
+        return rc, text, stderr, wait
+
+    def _run_stage(self, node, argv, stdin, stdin_path, env):
+        """Run one command of a pipeline; return (rc, stdout, stderr, extra simulated seconds)."""
+        name = posixpath.basename(argv[0])
+        line = ' '.join(argv)
+        if name in ('set', 'cd', 'sync', 'wall', 'apt-get', 'yum', 'curl') and 'get.rke2.io' not in line:
+            return 0, '', '', 0.0
+        if name == 'rke2-uninstall.sh':
+            self.uninstall(node)
+            return 0, '', '', 0.0
+        if name == 'rke2-killall.sh':
+            for service in RKE2_SERVICES:
+                self.stop_service(node, service)
+            return 0, '', '', 0.0
+        if classify_script(line) == 'install' or (name in ('sh', 'bash') and argv[1:] == ['-']):
+            self.install(node)
+            return 0, INSTALL_OUTPUT, '', 0.0
+        if name == 'sudo':
+            argv = argv[1:]
+            while argv and argv[0].startswith('-'):
+                argv = argv[2:] if argv[0] in ('-u', '-g') else argv[1:]
+            return self._run_stage(node, argv, stdin, stdin_path, env) if argv else (0, '', '', 0.0)
+        if name == 'dpkg-query':
+            # Nodes come with every queried package installed
+            fields = _option_value(argv, '-f', '--showformat') or '${Package}\n'
+            packages = [word for word in argv[1:] if not word.startswith('-')]
+            text = ''.join(fields.replace('${Package}', package).replace('${Status}', 'install ok installed')
+                           .replace('\\n', '\n') for package in packages)
+            return 0, text, '', 0.0
+        if name == 'df':
+            available = int(self.profile['facts']['root_size_available']) // 1024 ** 3
+            return 0, f"Avail\n {available}G\n", '', 0.0
+        if name == 'sleep':
+            return 0, '', '', float(argv[1]) if len(argv) > 1 and re.match(r'^[\d.]+$', argv[1]) else 0.0
+        if name == 'echo':
+            return 0, ' '.join(argv[1:]) + '\n', '', 0.0
+        if name == 'kubectl':
+            rc, stdout, stderr = self.kubectl(node, argv[1:])
+            return rc, stdout, stderr, 0.0
+        if name == 'etcdctl':
+            rc, stdout, stderr = self.etcdctl(node, argv[1:])
+            return rc, stdout, stderr, 0.0
+        if name == 'systemctl':
+            return self.systemctl(node, argv[1:])
+        if name == 'fsync_bench.py' or (len(argv) > 1 and posixpath.basename(argv[1]) == 'fsync_bench.py'):
+            return self.fsync_bench(argv[argv.index(next(w for w in argv if w.endswith('fsync_bench.py'))) + 1:])
+        if name == 'tr' and stdin_path == '/dev/urandom':
+            alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+            return 0, ''.join(self.random.choice(alphabet) for _ in range(256)), '', 0.0
+        if name in ('cat', 'grep', 'awk', 'cut') and stdin_path is None:
+            paths = [word for word in argv[1:] if word.startswith('/')]
+            if paths:
+                if paths[0] not in node['files']:
+                    return 2, '', f"{name}: {paths[0]}: No such file or directory\n", 0.0
+                stdin = node['files'][paths[0]] or ''
+                argv = [word for word in argv if word != paths[0]]
+        filtered = text_filter(argv, stdin)
+        if filtered is not None:
+            return filtered[0], filtered[1], '', 0.0
+        return 0, '', '', 0.0
+
+    def systemctl(self, node, args):
+        """Answer systemctl; return (rc, stdout, stderr, extra simulated seconds)."""
+        words = [word for word in args if not word.startswith('-')]
+        if not words:
+            return 0, '', '', 0.0
+        verb, units = words[0], [unit[:-len('.service')] if unit.endswith('.service') else unit for unit in words[1:]]
+        wait = 0.0
+        for unit in units:
+            if verb in ('start', 'restart'):
+                extra, error = self.start_service(node, unit, restart=verb == 'restart')
+                if error:
+                    return 5, '', f"Failed to {verb} {unit}.service: {error}\n", extra
+                wait += extra
+            elif verb == 'stop':
+                self.stop_service(node, unit)
+            elif verb == 'enable' and unit in RKE2_SERVICES and '/usr/local/bin/rke2' not in node['files']:
+                return 1, '', f"Failed to enable unit: Unit file {unit}.service does not exist.\n", 0.0
+        if verb in ('is-active', 'status'):
+            active = all(self._up(node, unit) or unit not in RKE2_SERVICES for unit in units)
+            state = 'active' if active else 'inactive'
+            text = state + '\n' if verb == 'is-active' else ''.join(
+                f"* {unit}.service\n     Active: {state}\n" for unit in units)
+            return (0 if active else 3), text, '', wait
+        if verb == 'is-system-running':
+            return 0, 'running\n', '', wait
+        return 0, '', '', wait
+
+    def fsync_bench(self, args):
+        """Answer fsync_bench.py with latencies drawn around the profile's fsync_ms."""
+        options = parse_fsync_args(args)
+        mean = float(self.profile.get('fsync_ms', 1.0)) / 1000
+        latencies = [self.random.expovariate(1 / mean) for _ in range(options.count)]
+        result = evaluate(summarize(latencies, options.block_size), options.directory, options.threshold_ms)
+        return (0 if result['passed'] else 2), json.dumps(result) + '\n', '', 0.0
+
+    # -- kubectl and etcdctl -----------------------------------------------
+
+    def _api_node(self, node):
+        """kubectl on a node talks to its local apiserver (the role runs rke2-server on every node)."""
+        return self._up(node, 'rke2-server')
+
+    def kubectl(self, node, args):
+        """Answer a kubectl command line (without 'kubectl'); return (rc, stdout, stderr)."""
+        command = args[args.index('--') + 1:] if '--' in args else []
+        args = args[:args.index('--')] if '--' in args else args
+        words, index = [], 0
+        while index < len(args):
+            word = args[index]
+            if word in ('--kubeconfig', '-n', '--namespace', '-l', '--selector', '--field-selector', '-o',
+                        '--output', '--raw'):
+                words.append((word, args[index + 1] if index + 1 < len(args) else ''))
+                index += 2
+                continue
+            words.append(word)
+            index += 1
+        options = dict(word for word in words if isinstance(word, tuple))
+        options.update(dict(word.split('=', 1) for word in words if isinstance(word, str) and word.startswith('--')
+                            and '=' in word))
+        positional = [word for word in words if isinstance(word, str) and not word.startswith('-')]
+        output = options.get('-o') or options.get('--output') or ''
+        selector = options.get('-l') or options.get('--selector') or ''
+        no_headers = '--no-headers' in args
+
+        if not self._api_node(node):
+            return 1, '', API_REFUSED + '\n'
+        if not positional:
+            return 0, '', ''
+        verb, rest = positional[0], positional[1:]
+
+        if verb == 'exec':
+            pod = rest[0] if rest else ''
+            target = self.node(pod[len('etcd-'):]) if pod.startswith('etcd-') else None
+            if target is None or not self._up(target, 'rke2-server'):
+                return 1, '', f'Error from server (NotFound): pods "{pod}" not found\n'
+            if command and posixpath.basename(command[0]) == 'etcdctl':
+                return self.etcdctl(target, command[1:])
+            return 0, '', ''
+        if verb in ('cordon', 'uncordon', 'drain'):
+            target = self._find_node(rest[0] if rest else '')
+            if target is None:
+                return 1, '', f'Error from server (NotFound): nodes "{rest[0] if rest else ""}" not found\n'
+            target['cordoned'] = verb != 'uncordon'
+            return 0, f"node/{target['name'].lower()} {verb}ed\n", ''
+        if verb == 'delete' and rest[:1] in (['node'], ['nodes']):
+            target = self._find_node(rest[1] if len(rest) > 1 else '')
+            if target is None:
+                return 1, '', f'Error from server (NotFound): nodes "{rest[1] if len(rest) > 1 else ""}" not found\n'
+            target['registered_at'] = target['ready_at'] = None
+            return 0, f'node "{target["name"]}" deleted\n', ''
+        if verb == 'get' and options.get('--raw'):
+            return 0, 'ok', ''
+        if verb in ('get', 'describe') and rest and rest[0] in ('node', 'nodes', 'no'):
+            return self._get_nodes(verb, rest[1:], output, selector, no_headers)
+        if verb == 'get' and rest and rest[0] in ('pods', 'pod', 'po'):
+            return self._get_pods(options.get('--field-selector', ''), output, no_headers)
+        return 0, '', ''
+
+    def _find_node(self, name):
+        for node in self._registered_nodes():
+            if node['name'].lower() == name.lower():
+                return node
+        return None
+
+    def _node_values(self, node):
+        return {
+            'Ready': 'True' if self._ready(node) else 'False',
+            'unschedulable': 'true' if node['cordoned'] else '',
+            'metadata.name': node['name'].lower(),
+        }
+
+    def _get_nodes(self, verb, names, output, selector, no_headers):
+        if names:
+            node = self._find_node(names[0])
+            if node is None:
+                return 1, '', f'Error from server (NotFound): nodes "{names[0]}" not found\n'
+            selected = [node]
+        else:
+            selected = self._registered_nodes()
+            if 'control-plane' in selector and 'instance-type' not in selector:
+                selected = [node for node in selected if node['control_plane']]
+            elif selector:
+                selected = []
+        if verb == 'describe':
+            return 0, ''.join(f"Name: {node['name'].lower()}\nConditions:\n  Ready {self._node_values(node)['Ready']}\n"
+                              for node in selected), ''
+        if output.startswith('jsonpath='):
+            return 0, ' '.join(jsonpath_value(output[len('jsonpath='):], self._node_values(node))
+                               for node in selected), ''
+        if output == 'name':
+            return 0, ''.join(f"node/{node['name'].lower()}\n" for node in selected), ''
+        rows = [] if no_headers else ['NAME STATUS ROLES AGE VERSION']
+        for node in selected:
+            status = 'Ready' if self._ready(node) else 'NotReady'
+            if node['cordoned']:
+                status += ',SchedulingDisabled'
+            roles = 'control-plane,etcd,master' if node['control_plane'] else '<none>'
+            rows.append(f"{node['name'].lower()} {status} {roles} 1m v1.31.4+rke2r1")
+        return 0, ''.join(row + '\n' for row in rows), ''
+
+    def _get_pods(self, field_selector, output, no_headers):
+        pods = []
+        for node in self._registered_nodes():
+            names = NODE_PODS + (CONTROL_PLANE_PODS if node['control_plane'] else ())
+            phase = 'Running' if self._ready(node) else 'Pending'
+            pods.extend((f"{name}-{node['name'].lower()}", phase, node['name'].lower()) for name in names)
+        if field_selector.startswith('spec.nodeName='):
+            pods = [pod for pod in pods if pod[2] == field_selector.split('=', 1)[1].lower()]
+        if output.startswith('jsonpath='):
+            return 0, ' '.join(pod[1] for pod in pods), ''
+        rows = [] if no_headers else ['NAMESPACE NAME READY STATUS RESTARTS AGE NODE']
+        rows.extend(f"kube-system {name} {'1/1' if phase == 'Running' else '0/1'} {phase} 0 1m {node}"
+                    for name, phase, node in pods)
+        return 0, ''.join(row + '\n' for row in rows), ''
+
+    def etcdctl(self, node, args):
+        """Answer an etcdctl command line; return (rc, stdout, stderr)."""
+        words = [word for word in args if not word.startswith('-')]
+        if not self._up(node, 'rke2-server'):
+            return 1, '', 'Error: context deadline exceeded\n'
+        if words[:2] == ['member', 'list']:
+            return 0, ''.join(
+                f"{member_id(member['name'])}, started, {member['name']}-{member_id(member['name'])[:8]}, "
+                f"https://{member['address']}:2380, https://{member['address']}:2379, false\n"
+                for member in self._members()), ''
+        if words[:2] == ['member', 'remove']:
+            for member in self._members():
+                if len(words) > 2 and member_id(member['name']) == words[2]:
+                    member['etcd_member'] = False
+                    return 0, f"Member {words[2]} removed from cluster\n", ''
+            return 1, '', f"Error: etcdserver: member not found\n"
+        if words[:2] == ['endpoint', 'health']:
+            if self._quorum():
+                return 0, 'https://127.0.0.1:2379 is healthy: successfully committed proposal: took = 2ms\n', ''
+            return 1, '', 'https://127.0.0.1:2379 is unhealthy: failed to commit proposal: context deadline exceeded\n'
+        return 0, '', ''
+
+
+class SimServer(object):
+    """HTTP front end for ClusterState, used by the connection plugin from Ansible's workers."""
+
+    def __init__(self, state, host='127.0.0.1', port=0):
+        self.state = state
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(handler):
+                length = int(handler.headers.get('Content-Length') or 0)
+                body = json.loads(handler.rfile.read(length) or b'{}')
+                response = state.handle(body.get('host', ''), body.get('request', {}))
+                handler._send(response)
+
+            def do_GET(handler):
+                handler._send({'stats': state.stats, 'cluster': state.snapshot()})
+
+            def _send(handler, data):
+                payload = json.dumps(data).encode()
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'application/json')
+                handler.send_header('Content-Length', str(len(payload)))
+                handler.end_headers()
+                handler.wfile.write(payload)
+
+            def log_message(handler, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def send_request(url, host, request, timeout=60):
+    """POST one request to a SimServer and return its response."""
+    data = json.dumps({'host': host, 'request': request}).encode()
+    with urlopen(Request(url, data=data, headers={'Content-Type': 'application/json'}), timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def build_inventory(node_count, control_planes=3, rke2_version='v1.31.4+rke2r1'):
+    """Return an inventory for node_count simulated hosts that use the rke2_sim connection."""
+    control_planes = min(control_planes, node_count)
+    names = [f"sim-cp{i + 1}" for i in range(control_planes)]
+    names += [f"sim-worker{i + 1}" for i in range(node_count - control_planes)]
+    lines = ['[vars]', f'rke2_version={rke2_version}', '', '[six_node]']
+    lines += [f"{name} 10.{(i + 1) // 65536 % 256}.{(i + 1) // 256 % 256}.{(i + 1) % 256}"
+              for i, name in enumerate(names)]
+    lines += ['', '[control_plane_nodes]'] + names[:control_planes]
+    lines += ['', '[worker_nodes]'] + names[control_planes:]
+    inventory = generate_inventory_from_lines(lines)
+    inventory['all']['vars'].update({
+        'ansible_connection': 'rke2_sim',
+        'ansible_pipelining': True,
+    })
+    inventory['all']['vars'].pop('ansible_ssh_common_args', None)
+    return inventory
+
+
+def inventory_hosts(inventory):
+    """Yield (name, address, is control plane) for every host of a generated inventory."""
+    groups = inventory['all']['children']['six_node_cluster']['children']
+    for group, control_plane in (('control_plane_nodes', True), ('worker_nodes', False)):
+        for name, host_vars in (groups.get(group, {}).get('hosts') or {}).items():
+            yield name, host_vars.get('ansible_host', name), control_plane
+
+
+def summarize_timings(timings):
+    """Return per-play and per-phase (task file) seconds from an rke2_timing callback file."""
+    plays, phases = {}, {}
+    for task in timings.get('tasks', []):
+        plays[task['play']] = round(plays.get(task['play'], 0.0) + task['seconds'], 3)
+        path = task.get('path') or ''
+        phase = posixpath.basename(path.split(':')[0]) if task.get('role') else task['play']
+        entry = phases.setdefault(phase, {'seconds': 0.0, 'tasks': 0})
+        entry['seconds'] = round(entry['seconds'] + task['seconds'], 3)
+        entry['tasks'] += 1
+    slowest = sorted(timings.get('tasks', []), key=lambda task: -task['seconds'])[:10]
+    return {
+        'seconds': timings.get('seconds', 0.0),
+        'plays': plays,
+        'phases': phases,
+        'slowest_tasks': [{'name': task['name'], 'path': task.get('path'), 'seconds': task['seconds']}
+                          for task in slowest],
+    }
+
+
+def prepare_controller_home(workdir, rke2_version, architectures=('amd64', 'arm64')):
+    """Create a controller $HOME holding empty stand-ins for the airgap image downloads.
+
+    The role downloads the image archives to ~/Downloads/rke2-images on the
+    controller and copies them to the nodes; the simulation must not fetch
+    gigabytes from GitHub.
+    """
+    home = os.path.join(workdir, 'home')
+    version_dir = os.path.join(home, 'Downloads', 'rke2-images', rke2_version)
+    os.makedirs(version_dir, exist_ok=True)
+    for arch in architectures:
+        open(os.path.join(version_dir, f"rke2-images.linux-{arch}.tar.zst"), 'a').close()
+    return home
+
+
+def run_playbook(playbook, inventory_path, url, workdir, forks=5, extra_vars=(), ansible_playbook='ansible-playbook',
+                 home=None):
+    """Run one playbook against the simulated cluster; return (rc, wall seconds, timings, log path)."""
+    name = os.path.splitext(os.path.basename(playbook))[0]
+    timing_path = os.path.join(workdir, f"{name}.timings.json")
+    log_path = os.path.join(workdir, f"{name}.log")
+    env = dict(os.environ)
+    if home:
+        # Keep Ansible's own state (collections, tmp) where it was before moving HOME
+        ansible_home = env.get('ANSIBLE_HOME') or os.path.expanduser('~/.ansible')
+        env.setdefault('ANSIBLE_HOME', ansible_home)
+        env.setdefault('ANSIBLE_COLLECTIONS_PATH', os.pathsep.join(
+            [os.path.join(ansible_home, 'collections'), '/usr/share/ansible/collections']))
+        env['HOME'] = home
+    env.update({
+        'RKE2_SIM_URL': url,
+        'RKE2_TIMING_FILE': timing_path,
+        'ANSIBLE_CALLBACKS_ENABLED': ','.join(filter(None, [env.get('ANSIBLE_CALLBACKS_ENABLED'), 'rke2_timing'])),
+        'ANSIBLE_HOST_KEY_CHECKING': 'False',
+        'ANSIBLE_RETRY_FILES_ENABLED': 'False',
+    })
+    command = [ansible_playbook, '-i', inventory_path, playbook, '-f', str(forks)]
+    for extra in extra_vars:
+        command += ['-e', extra]
+
+    start = time.perf_counter()
+    with open(log_path, 'w') as log:
+        rc = subprocess.call(command, cwd=REPO_ROOT, env=env, stdin=subprocess.DEVNULL,
+                             stdout=log, stderr=subprocess.STDOUT)
+    seconds = round(time.perf_counter() - start, 3)
+    try:
+        with open(timing_path, 'r') as f:
+            timings = json.load(f)
+    except (OSError, ValueError):
+        timings = {}
+    return rc, seconds, timings, log_path
+
+
+def format_report(report):
+    """Return the human readable report."""
+    lines = [f"Simulated cluster: {report['nodes']} nodes ({report['control_planes']} control planes), "
+             f"time scale {report['time_scale']}"]
+    for run in report['playbooks']:
+        status = 'ok' if run['rc'] == 0 else f"FAILED (rc {run['rc']}, see {run['log']})"
+        lines.append('')
+        lines.append(f"{run['playbook']}: {status}, {run['seconds']:.1f}s wall")
+        summary = run['summary']
+        if summary['plays']:
+            lines.append('  Plays')
+            lines.extend(f"    {seconds:>9.1f}s  {play}" for play, seconds in summary['plays'].items())
+        if summary['phases']:
+            lines.append('  Phases')
+            lines.extend(f"    {phase['seconds']:>9.1f}s  {name} ({phase['tasks']} tasks)"
+                         for name, phase in sorted(summary['phases'].items(), key=lambda item: -item[1]['seconds']))
+    lines.append('')
+    lines.append('Simulated operations')
+    for kind, entry in sorted(report['operations'].items(), key=lambda item: -item[1]['seconds']):
+        lines.append(f"  {kind:<10} {entry['count']:>7} calls {entry['failed']:>5} failed "
+                     f"{entry['seconds']:>9.1f}s total {entry['max_seconds']:>7.2f}s max")
+    cluster = report['cluster']
+    lines.append(f"Cluster: {cluster['registered']} registered, {cluster['ready']} ready, "
+                 f"{cluster['etcd_members']} etcd members")
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Run playbooks against a simulated RKE2 cluster.')
+    parser.add_argument('playbooks', nargs='+', help='Playbooks to run in order against the same cluster')
+    parser.add_argument('-n', '--nodes', type=int, default=6, help='Number of simulated nodes (default: 6)')
+    parser.add_argument('--control-planes', type=int, default=3, help='How many of them are control planes (default: 3)')
+    parser.add_argument('--profile', help='YAML/JSON file overriding latencies, failure rates and facts')
+    parser.add_argument('--time-scale', type=float, help='Wall seconds per simulated second (overrides the profile)')
+    parser.add_argument('--seed', type=int, help='Random seed for jitter and failure injection')
+    parser.add_argument('-f', '--forks', type=int, default=5, help='Ansible forks (default: 5)')
+    parser.add_argument('-e', '--extra-vars', action='append', default=[], help='Passed to ansible-playbook')
+    parser.add_argument('--workdir', help='Keep inventory, logs and timings here (default: a temporary directory)')
+    parser.add_argument('-o', '--output', help='Write the report as JSON to this file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.nodes < 1:
+        print("Error: --nodes must be at least 1", file=sys.stderr)
+        return 1
+    try:
+        profile = load_profile(args.profile)
+    except (OSError, yaml.YAMLError) as e:
+        print(f"Error: cannot load profile: {e}", file=sys.stderr)
+        return 1
+    if args.time_scale is not None:
+        profile['time_scale'] = args.time_scale
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='rke2-sim-')
+    os.makedirs(workdir, exist_ok=True)
+    inventory = build_inventory(args.nodes, args.control_planes)
+    inventory_path = os.path.join(workdir, 'rke2.yml')
+    write_inventory_file(inventory, inventory_path)
+
+    home = prepare_controller_home(workdir, inventory['all']['vars']['rke2_version'])
+
+    state = ClusterState(profile, seed=args.seed)
+    for name, address, control_plane in inventory_hosts(inventory):
+        state.add_node(name, address, control_plane)
+    server = SimServer(state).start()
+
+    report = {
+        'nodes': args.nodes,
+        'control_planes': min(args.control_planes, args.nodes),
+        'time_scale': profile['time_scale'],
+        'playbooks': [],
+    }
+    try:
+        for playbook in args.playbooks:
+            print(f"Running {playbook} against {args.nodes} simulated nodes...", flush=True)
+            rc, seconds, timings, log_path = run_playbook(
+                playbook, inventory_path, server.url, workdir, args.forks, args.extra_vars, home=home)
+            report['playbooks'].append({
+                'playbook': playbook,
+                'rc': rc,
+                'seconds': seconds,
+                'log': log_path,
+                'summary': summarize_timings(timings),
+            })
+            if rc != 0:
+                break
+    finally:
+        server.stop()
+
+    report['operations'] = state.stats
+    report['cluster'] = state.snapshot()
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    return 0 if all(run['rc'] == 0 for run in report['playbooks']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
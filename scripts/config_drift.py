@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Semantic comparison of RKE2 config.yaml files.
+
+Configs are compared after parsing, so comments, key order, list order and
+formatting do not count as drift. Only the effective configuration does.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+
+import yaml
+
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def load_config(content):
+    """Parse config text (or pass through parsed data); empty input is an empty config."""
+    if content is None:
+        return {}
+    if isinstance(content, (bytes, str)):
+        # The libyaml loader rejects str subclasses such as Ansible's unsafe
+        # text, so always hand it a stream
+        stream = io.BytesIO(content) if isinstance(content, bytes) else io.StringIO(content)
+        data = yaml.load(stream, Loader=SafeLoader)
+        return data if data is not None else {}
+    return content
+
+
+def _sort_key(value):
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def normalize_config(value):
+    """Return a canonical form of a config: sorted keys and order-insensitive lists."""
+    if isinstance(value, dict):
+        return {str(k): normalize_config(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return sorted((normalize_config(v) for v in value), key=_sort_key)
+    return value
+
+
+def config_digest(content):
+    """Return a SHA-256 digest of the effective configuration."""
+    canonical = json.dumps(normalize_config(load_config(content)), sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def diff_configs(deployed, desired, path=''):
+    """Return the semantic differences between two configs.
+
+    Each entry is a dict with 'path', 'change' (added, removed or changed)
+    and the deployed/desired values.
+    """
+    deployed = normalize_config(load_config(deployed)) if not path else deployed
+    desired = normalize_config(load_config(desired)) if not path else desired
+    changes = []
+
+    if isinstance(deployed, dict) and isinstance(desired, dict):
+        for key in sorted(set(deployed) | set(desired)):
+            key_path = f"{path}.{key}" if path else key
+            if key not in deployed:
+                changes.append({'path': key_path, 'change': 'added', 'deployed': None, 'desired': desired[key]})
+            elif key not in desired:
+                changes.append({'path': key_path, 'change': 'removed', 'deployed': deployed[key], 'desired': None})
+            else:
+                changes.extend(diff_configs(deployed[key], desired[key], key_path))
+    elif isinstance(deployed, list) and isinstance(desired, list):
+        deployed_items = {_sort_key(v): v for v in deployed}
+        desired_items = {_sort_key(v): v for v in desired}
+        for key in sorted(set(deployed_items) | set(desired_items)):
+            if key not in deployed_items:
+                changes.append({'path': path, 'change': 'added', 'deployed': None, 'desired': desired_items[key]})
+            elif key not in desired_items:
+                changes.append({'path': path, 'change': 'removed', 'deployed': deployed_items[key], 'desired': None})
+    elif deployed != desired:
+        changes.append({'path': path, 'change': 'changed', 'deployed': deployed, 'desired': desired})
+
+    return changes
+
+
+def compare_directories(deployed_dir, desired_dir, suffix='_config.yaml'):
+    """Compare <host>_config.yaml files in two directories, returning a per-host report."""
+    report = {}
+    hosts = set()
+    for directory in (deployed_dir, desired_dir):
+        hosts.update(f[:-len(suffix)] for f in os.listdir(directory) if f.endswith(suffix))
+
+    for host in sorted(hosts):
+        contents = []
+        for directory in (deployed_dir, desired_dir):
+            file_path = os.path.join(directory, host + suffix)
+            if os.path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    contents.append(f.read())
+            else:
+                contents.append(None)
+        deployed, desired = contents
+        report[host] = {
+            'missing': deployed is None,
+            'changes': diff_configs(deployed, desired),
+        }
+    return report
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Report semantic differences between deployed and desired RKE2 configs.'
+    )
+    parser.add_argument('deployed', help='Deployed config file, or directory of <host>_config.yaml files')
+    parser.add_argument('desired', help='Desired config file, or directory of <host>_config.yaml files')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if os.path.isdir(args.deployed) and os.path.isdir(args.desired):
+        report = compare_directories(args.deployed, args.desired)
+    else:
+        with open(args.deployed, 'r') as f:
+            deployed = f.read()
+        with open(args.desired, 'r') as f:
+            desired = f.read()
+        report = {os.path.basename(args.desired): {'missing': False, 'changes': diff_configs(deployed, desired)}}
+
+    print(json.dumps(report, indent=2, default=str))
+    drifted = [host for host, result in report.items() if result['missing'] or result['changes']]
+    print(f"{len(drifted)} of {len(report)} configs drifted", file=sys.stderr)
+    return 1 if drifted else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Distribute an SSH public key to every inventory host in parallel.
+
+Key authentication is checked on all hosts at once with a bounded thread
+pool; the key is only pushed (via sshpass) to hosts where that check fails.
+A JSON summary of the run is written at the end.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+DEFAULT_WORKERS = 32
+DEFAULT_TIMEOUT = 5
+
+# Reads the key from stdin so it never appears in the remote process list
+PUSH_KEY_SCRIPT = (
+    'umask 077; mkdir -p ~/.ssh && touch ~/.ssh/authorized_keys && '
+    'read -r key && '
+    '(grep -qxF "$key" ~/.ssh/authorized_keys || echo "$key" >> ~/.ssh/authorized_keys)'
+)
+
+
+class SubprocessTransport:
+    """Run ssh/sshpass on the local machine."""
+
+    def run(self, args, input_data=None, env=None, timeout=None):
+        """Run a command and return (returncode, stdout, stderr)."""
+        try:
+            result = subprocess.run(
+                args,
+                input=input_data,
+                capture_output=True,
+                text=True,
+                env=env,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return 255, '', 'timed out'
+        except FileNotFoundError as e:
+            return 127, '', str(e)
+        return result.returncode, result.stdout, result.stderr
+
+
+def ssh_base_args(connect_timeout=DEFAULT_TIMEOUT, port=None):
+    """Build the ssh options shared by the check and push commands."""
+    args = [
+        'ssh',
+        '-o', f'ConnectTimeout={connect_timeout}',
+        '-o', 'StrictHostKeyChecking=no',
+    ]
+    if port:
+        args += ['-p', str(port)]
+    return args
+
+
+def build_check_command(host, connect_timeout=DEFAULT_TIMEOUT):
+    """Build the command used to test public key authentication."""
+    return ssh_base_args(connect_timeout, host.get('port')) + [
+        '-o', 'BatchMode=yes',
+        '-o', 'PreferredAuthentications=publickey',
+        f"{host['user']}@{host['address']}",
+        'echo success',
+    ]
+
+
+def build_push_command(host, connect_timeout=DEFAULT_TIMEOUT):
+    """Build the sshpass command that appends the key to authorized_keys."""
+    return ['sshpass', '-e'] + ssh_base_args(connect_timeout, host.get('port')) + [
+        '-o', 'PreferredAuthentications=password',
+        '-o', 'PubkeyAuthentication=no',
+        f"{host['user']}@{host['address']}",
+        PUSH_KEY_SCRIPT,
+    ]
+
+
+def load_hosts(inventory_file):
+    """Return host dicts (name, address, user, port) from an inventory YAML file."""
+    with open(inventory_file, 'r') as f:
+        inventory = yaml.safe_load(f) or {}
+
+    default_user = inventory.get('all', {}).get('vars', {}).get('ansible_user', 'ubuntu')
+    hosts = {}
+
+    def walk(group):
+        if not isinstance(group, dict):
+            return
+        for name, host_vars in (group.get('hosts') or {}).items():
+            host_vars = host_vars or {}
+            hosts[name] = {
+                'name': name,
+                'address': host_vars.get('ansible_host', name),
+                'user': host_vars.get('ansible_user', default_user),
+                'port': host_vars.get('ansible_port'),
+            }
+        for child in (group.get('children') or {}).values():
+            walk(child)
+
+    walk(inventory.get('all', {}))
+    return list(hosts.values())
+
+
+def check_key_auth(host, transport, connect_timeout=DEFAULT_TIMEOUT):
+    """Return True if the host already accepts our key."""
+    rc, stdout, _ = transport.run(
+        build_check_command(host, connect_timeout),
+        timeout=connect_timeout * 3,
+    )
+    return rc == 0 and 'success' in stdout
+
+
+def push_key(host, public_key, password, transport, connect_timeout=DEFAULT_TIMEOUT):
+    """Append the public key to the host's authorized_keys using password auth."""
+    env = dict(os.environ, SSHPASS=password)
+    rc, _, stderr = transport.run(
+        build_push_command(host, connect_timeout),
+        input_data=public_key.strip() + '\n',
+        env=env,
+        timeout=connect_timeout * 6,
+    )
+    return rc, stderr.strip()
+
+
+def process_host(host, public_key, password, transport, connect_timeout=DEFAULT_TIMEOUT):
+    """Check a single host and push the key if needed."""
+    start = time.monotonic()
+    result = {'host': host['name'], 'address': host['address']}
+
+    if check_key_auth(host, transport, connect_timeout):
+        result['status'] = 'present'
+    elif password is None:
+        result['status'] = 'failed'
+        result['error'] = 'Public key authentication failed and no password was provided'
+    else:
+        rc, error = push_key(host, public_key, password, transport, connect_timeout)
+        if rc == 0 and check_key_auth(host, transport, connect_timeout):
+            result['status'] = 'pushed'
+        else:
+            result['status'] = 'failed'
+            result['error'] = error or f'Key push exited with status {rc}'
+
+    result['elapsed'] = round(time.monotonic() - start, 3)
+    return result
+
+
+def distribute_keys(hosts, public_key, password=None, transport=None,
+                    max_workers=DEFAULT_WORKERS, connect_timeout=DEFAULT_TIMEOUT):
+    """Check and push keys for all hosts concurrently and return a summary."""
+    transport = transport or SubprocessTransport()
+    start = time.monotonic()
+
+    workers = max(1, min(max_workers, len(hosts) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda host: process_host(host, public_key, password, transport, connect_timeout),
+            hosts,
+        ))
+
+    counts = {'present': 0, 'pushed': 0, 'failed': 0}
+    for result in results:
+        counts[result['status']] += 1
+
+    return {
+        'total': len(results),
+        'counts': counts,
+        'elapsed': round(time.monotonic() - start, 3),
+        'hosts': results,
+    }
+
+
+def write_summary(summary, file_path):
+    """Write the run summary as JSON."""
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Distribute an SSH public key to all inventory hosts in parallel.'
+    )
+    parser.add_argument(
+        '-i', '--inventory',
+        default='inventory/rke2.yml',
+        help='Inventory file (default: inventory/rke2.yml)'
+    )
+    parser.add_argument(
+        '-k', '--key',
+        default='~/.ssh/id_ed25519.pub',
+        help='Public key to distribute (default: ~/.ssh/id_ed25519.pub)'
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f'Maximum concurrent connections (default: {DEFAULT_WORKERS})'
+    )
+    parser.add_argument(
+        '-t', '--timeout',
+        type=int,
+        default=DEFAULT_TIMEOUT,
+        help=f'SSH connect timeout in seconds (default: {DEFAULT_TIMEOUT})'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        default='generated_configs/ssh_key_distribution.json',
+        help='JSON summary file (default: generated_configs/ssh_key_distribution.json)'
+    )
+    parser.add_argument(
+        '-l', '--limit',
+        help='Comma separated list of host names to process'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    with open(os.path.expanduser(args.key), 'r') as f:
+        public_key = f.read().strip()
+
+    hosts = load_hosts(args.inventory)
+    if args.limit:
+        wanted = set(args.limit.split(','))
+        hosts = [host for host in hosts if host['name'] in wanted]
+
+    # Password is only used for hosts where key auth fails
+    password = os.environ.get('SSHPASS')
+
+    summary = distribute_keys(
+        hosts,
+        public_key,
+        password=password,
+        max_workers=args.workers,
+        connect_timeout=args.timeout,
+    )
+    write_summary(summary, args.output)
+
+    for result in summary['hosts']:
+        line = f"{result['host']:<20} {result['status']}"
+        if 'error' in result:
+            line += f" ({result['error']})"
+        print(line)
+    print(f"\n{summary['counts']['present']} present, {summary['counts']['pushed']} pushed, "
+          f"{summary['counts']['failed']} failed in {summary['elapsed']}s")
+    print(f"Summary written to {args.output}")
+
+    return 1 if summary['counts']['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,8 +2,48 @@
 
 import yaml
 import os
+import shutil
+import ipaddress
+import re
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Prefer the libyaml C loader, fall back to the pure-Python one
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# ioctl request used by Linux filesystems (btrfs, xfs) to share extents
+FICLONE = 0x40049409
+
+BOOL_TAG = 'tag:yaml.org,2002:bool'
+NULL_TAG = 'tag:yaml.org,2002:null'
+GROUP_KEYS = ('hosts', 'children', 'vars')
+MOUNT_KEYS = ('enabled', 'device', 'fstype', 'opts')
+
+# RFC 1123 host name: dot separated labels of letters, digits and inner hyphens
+HOSTNAME_RE = re.compile(r'^(?=.{1,253}$)[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?'
+                         r'(\.[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*\.?$')
+
+# Only used for its flatten_mapping, which resolves '<<' merge keys on a node
+_MERGER = yaml.constructor.SafeConstructor()
+
+def _error(node, message):
+    """Build a ValueError pointing at the line of a YAML node."""
+    return ValueError(f"Line {node.start_mark.line + 1}: {message}")
+
+def _mapping_items(node, what):
+    """Return (key, value) node pairs of a mapping node."""
+    if node.tag == NULL_TAG:
+        return []
+    if not isinstance(node, yaml.MappingNode):
+        raise _error(node, f"{what} must be a mapping")
+    # Resolve '<<' merge keys in place, as constructing the document does
+    _MERGER.flatten_mapping(node)
+    return node.value
+
 def validate_yaml_structure(data):
     """Validate the basic structure of the YAML data."""
     if not isinstance(data, dict):
@@ -17,14 +57,106 @@ def validate_yaml_structure(data):
     
     return True
 
+def validate_vars_node(node, where):
+    """Validate a vars mapping: keys must be plain strings."""
+    for key, _ in _mapping_items(node, f"vars in {where}"):
+        if not isinstance(key, yaml.ScalarNode) or not key.value:
+            raise _error(key, f"Invalid variable name in {where}")
+
+def validate_mounts_node(node, hostname):
+    """Validate the mounts section of a host entry."""
+    for key, mount in _mapping_items(node, f"mounts for host '{hostname}'"):
+        name = key.value
+        fields = dict((k.value, v) for k, v in _mapping_items(mount, f"mount '{name}' for host '{hostname}'"))
+        for field in fields:
+            if field not in MOUNT_KEYS:
+                raise _error(mount, f"Unknown field '{field}' in mount '{name}' for host '{hostname}'")
+        if 'enabled' in fields and fields['enabled'].tag != BOOL_TAG:
+            raise _error(fields['enabled'], f"Mount '{name}' for host '{hostname}': 'enabled' must be a boolean")
+        device = fields.get('device')
+        if device is None or not isinstance(device, yaml.ScalarNode) or not device.value.startswith('/dev/'):
+            raise _error(device or mount, f"Mount '{name}' for host '{hostname}' needs a device under /dev/")
+
+def validate_address_node(node, hostname):
+    """Validate ansible_host: an IP address or a DNS host name."""
+    address = node.value if isinstance(node, yaml.ScalarNode) else None
+    if not isinstance(address, str) or ':' in address or re.fullmatch(r'[0-9.]+', address):
+        # Looks like an IP address (all digits and dots, or IPv6), so it must be one
+        try:
+            ipaddress.ip_address(address)
+        except (ValueError, TypeError):
+            raise _error(node, f"Invalid IP address for host '{hostname}': {address}")
+    elif not HOSTNAME_RE.match(address):
+        raise _error(node, f"Invalid host name for host '{hostname}': {address}")
+
+def validate_host_node(hostname, node):
+    """Validate a single host entry."""
+    for key, value in _mapping_items(node, f"host '{hostname}'"):
+        if key.value == 'ansible_host':
+            validate_address_node(value, hostname)
+        elif key.value == 'mounts':
+            validate_mounts_node(value, hostname)
+
+def validate_group_node(name, node):
+    """Validate a group (hosts, children and vars) recursively."""
+    for key, value in _mapping_items(node, f"group '{name}'"):
+        if key.value not in GROUP_KEYS:
+            raise _error(key, f"Unknown key '{key.value}' in group '{name}'")
+        if key.value == 'hosts':
+            for host_key, host_node in _mapping_items(value, f"hosts in group '{name}'"):
+                validate_host_node(host_key.value, host_node)
+        elif key.value == 'children':
+            for child_key, child_node in _mapping_items(value, f"children of group '{name}'"):
+                validate_group_node(child_key.value, child_node)
+        else:
+            validate_vars_node(value, f"group '{name}'")
+
+def validate_inventory_node(node):
+    """Validate the full inventory schema on a composed YAML node tree."""
+    if not isinstance(node, yaml.MappingNode):
+        raise ValueError("YAML root must be a dictionary")
+    root = dict((k.value, v) for k, v in node.value)
+    if 'all' not in root:
+        raise _error(node, "Missing required field 'all' in YAML structure")
+    all_keys = dict((k.value, v) for k, v in _mapping_items(root['all'], "'all'"))
+    if 'children' not in all_keys:
+        raise _error(root['all'], "Missing required field 'children' in 'all' section")
+    validate_group_node('all', root['all'])
+    return True
+
+def load_yaml(stream):
+    """Load YAML with the fastest available loader, returning (data, node)."""
+    loader = SafeLoader(stream)
+    try:
+        node = loader.get_single_node()
+        data = loader.construct_document(node) if node is not None else None
+    finally:
+        loader.dispose()
+    return data, node
+
+def _reflink(src, dst):
+    """Try to clone a file with FICLONE; return False if unsupported."""
+    if fcntl is None:
+        return False
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.unlink(dst)
+        return False
+
 def backup_file(file_path):
     """Create a backup of the specified file."""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     backup_path = f"{file_path}.{timestamp}.bak"
     
     if os.path.exists(file_path):
-        with open(file_path, 'r') as src, open(backup_path, 'w') as dst:
-            dst.write(src.read())
+        # Reflink where the filesystem supports it, otherwise a streamed
+        # copy (sendfile/copy_file_range on Linux) without reading into memory
+        if not _reflink(file_path, backup_path):
+            shutil.copyfile(file_path, backup_path)
     
     return backup_path
 
@@ -33,11 +165,12 @@ def fix_yaml_file(file_path):
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    with open(file_path, 'r') as f:
+    with open(file_path, 'rb') as f:
         try:
-            data = yaml.safe_load(f)
+            data, node = load_yaml(f)
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML format: {str(e)}")
     
     validate_yaml_structure(data)
+    validate_inventory_node(node)
     return data
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Measure write + fdatasync latency the way etcd's WAL uses a disk.
+
+etcd appends small records to its write-ahead log and fdatasyncs each one
+before acknowledging a write. Slow syncs stretch heartbeats and trigger
+leader elections, so etcd's hardware guidance asks for a 99th percentile
+fdatasync latency below 10ms. This is the self-contained equivalent of
+
+    fio --rw=write --ioengine=sync --fdatasync=1 --bs=2300 --size=22m
+
+and only needs the Python standard library, so it can run on a node before
+anything is installed.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# Typical etcd WAL entry size used by the fio recipe in the etcd docs
+DEFAULT_BLOCK_SIZE = 2300
+DEFAULT_COUNT = 2000
+# etcd guidance: p99 of WAL fdatasync should stay below 10ms
+DEFAULT_THRESHOLD_MS = 10.0
+
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(latencies, block_size=DEFAULT_BLOCK_SIZE):
+    """Summarize sync latencies (seconds) in milliseconds."""
+    millis = [latency * 1000 for latency in latencies]
+    return {
+        'count': len(millis),
+        'block_size': block_size,
+        'min_ms': round(min(millis), 3) if millis else 0.0,
+        'avg_ms': round(sum(millis) / len(millis), 3) if millis else 0.0,
+        'p50_ms': round(percentile(millis, 50), 3),
+        'p90_ms': round(percentile(millis, 90), 3),
+        'p99_ms': round(percentile(millis, 99), 3),
+        'max_ms': round(max(millis), 3) if millis else 0.0,
+    }
+
+
+def run_benchmark(directory, block_size=DEFAULT_BLOCK_SIZE, count=DEFAULT_COUNT,
+                  sync=_fdatasync, clock=time.perf_counter):
+    """Append count blocks to a scratch file in directory, syncing after each one.
+
+    Returns the summary of the sync latencies. The scratch file is removed.
+    """
+    data = os.urandom(block_size)
+    fd, path = tempfile.mkstemp(dir=directory, prefix='.fsync-bench-')
+    latencies = []
+    try:
+        for _ in range(count):
+            os.write(fd, data)
+            start = clock()
+            sync(fd)
+            latencies.append(clock() - start)
+    finally:
+        os.close(fd)
+        os.unlink(path)
+    return summarize(latencies, block_size)
+
+
+def evaluate(result, directory, threshold_ms=DEFAULT_THRESHOLD_MS):
+    """Add the directory, threshold and pass/fail verdict to a benchmark result."""
+    result = dict(result)
+    result['directory'] = directory
+    result['threshold_ms'] = threshold_ms
+    result['passed'] = result['p99_ms'] <= threshold_ms
+    return result
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Measure fdatasync latency of a directory against the etcd guidance.'
+    )
+    parser.add_argument('directory', help='Directory on the disk to test (e.g. the etcd data directory)')
+    parser.add_argument(
+        '--block-size',
+        type=int,
+        default=DEFAULT_BLOCK_SIZE,
+        help=f'Bytes written before each sync (default: {DEFAULT_BLOCK_SIZE})'
+    )
+    parser.add_argument(
+        '--count',
+        type=int,
+        default=DEFAULT_COUNT,
+        help=f'Number of write + sync operations (default: {DEFAULT_COUNT})'
+    )
+    parser.add_argument(
+        '--threshold-ms',
+        type=float,
+        default=DEFAULT_THRESHOLD_MS,
+        help=f'Maximum acceptable p99 sync latency in ms (default: {DEFAULT_THRESHOLD_MS:g})'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Print the result as JSON; exit 0 if within threshold, 2 if above, 1 on error."""
+    args = parse_args(argv)
+    try:
+        os.makedirs(args.directory, exist_ok=True)
+        result = run_benchmark(args.directory, block_size=args.block_size, count=args.count)
+    except OSError as e:
+        print(json.dumps({'directory': args.directory, 'error': str(e)}))
+        return 1
+
+    result = evaluate(result, args.directory, args.threshold_ms)
+    print(json.dumps(result))
+    return 0 if result['passed'] else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
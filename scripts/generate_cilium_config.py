@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Generate the rke2-cilium HelmChartConfig from inventory vars.
+
+The [vars] section of hosts.txt (or any dict of Ansible vars) selects the
+Cilium datapath options: native routing or tunnelling, BPF masquerading,
+the bandwidth manager with BBR, XDP load balancer acceleration and Maglev,
+and whether the agent and operator expose Prometheus metrics. Features the
+oldest node kernel cannot run are left disabled.
+"""
+
+import argparse
+import ipaddress
+import re
+import sys
+
+import yaml
+
+try:
+    from scripts.inventory_index import InventoryIndex
+except ImportError:
+    from inventory_index import InventoryIndex
+
+DEFAULT_INVENTORY = 'inventory/rke2.yml'
+
+# Defaults keep the previous static HelmChartConfig: VXLAN tunnelling and
+# iptables masquerading
+DEFAULTS = {
+    'cilium_routing_mode': 'tunnel',
+    'cilium_tunnel_protocol': 'vxlan',
+    'cilium_native_routing_cidr': '10.42.0.0/16',   # RKE2 default cluster-cidr
+    'cilium_auto_direct_node_routes': True,
+    'cilium_bpf_masquerade': False,
+    'cilium_bandwidth_manager': False,
+    'cilium_bbr': False,
+    'cilium_xdp_acceleration': False,
+    'cilium_maglev': False,
+    'cilium_maglev_table_size': None,               # derived from the node count
+    'cilium_maglev_hash_seed': None,
+    'cilium_prometheus': False,                     # agent and operator metrics ports
+}
+
+ROUTING_MODES = ('native', 'tunnel')
+TUNNEL_PROTOCOLS = ('vxlan', 'geneve')
+
+# Minimum kernel per feature, from the Cilium system requirements
+MIN_KERNEL = {
+    'cilium_bpf_masquerade': (4, 19),
+    'cilium_bandwidth_manager': (5, 1),
+    'cilium_bbr': (5, 18),
+    'cilium_xdp_acceleration': (4, 19),
+    'cilium_maglev': (4, 19),
+}
+
+# Cilium only accepts these primes as maglev.tableSize
+MAGLEV_TABLE_SIZES = (251, 509, 1021, 2039, 4093, 8191, 16381, 32749, 65521, 131071)
+
+
+def to_bool(value):
+    """Interpret hosts.txt style booleans ('true', 'yes', '1', 'on')."""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('true', 'yes', '1', 'on')
+
+
+def parse_kernel_version(kernel):
+    """Return (major, minor) of a kernel release string like '5.15.0-91-generic'."""
+    match = re.match(r'^\s*(\d+)\.(\d+)', str(kernel or ''))
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def oldest_kernel(kernels):
+    """Return the lowest (major, minor) of a list of kernel releases, or None."""
+    versions = [v for v in (parse_kernel_version(k) for k in kernels or []) if v]
+    return min(versions) if versions else None
+
+
+def maglev_table_size(node_count):
+    """Return the smallest allowed Maglev table size of at least 100 entries per node."""
+    wanted = 100 * max(1, int(node_count))
+    for size in MAGLEV_TABLE_SIZES:
+        if size >= wanted:
+            return size
+    return MAGLEV_TABLE_SIZES[-1]
+
+
+def load_settings(inventory_vars):
+    """Merge cilium_* inventory vars over the defaults and validate them."""
+    settings = dict(DEFAULTS)
+    for key, value in (inventory_vars or {}).items():
+        if key in DEFAULTS and value not in (None, ''):
+            settings[key] = value
+
+    for key in MIN_KERNEL:
+        settings[key] = to_bool(settings[key])
+    settings['cilium_auto_direct_node_routes'] = to_bool(settings['cilium_auto_direct_node_routes'])
+    settings['cilium_prometheus'] = to_bool(settings['cilium_prometheus'])
+
+    if settings['cilium_routing_mode'] not in ROUTING_MODES:
+        raise ValueError(f"cilium_routing_mode must be one of {', '.join(ROUTING_MODES)}: "
+                         f"{settings['cilium_routing_mode']}")
+    if settings['cilium_tunnel_protocol'] not in TUNNEL_PROTOCOLS:
+        raise ValueError(f"cilium_tunnel_protocol must be one of {', '.join(TUNNEL_PROTOCOLS)}: "
+                         f"{settings['cilium_tunnel_protocol']}")
+    try:
+        ipaddress.ip_network(settings['cilium_native_routing_cidr'])
+    except ValueError:
+        raise ValueError(f"Invalid cilium_native_routing_cidr: {settings['cilium_native_routing_cidr']}")
+    if settings['cilium_maglev_table_size'] not in (None, ''):
+        if int(settings['cilium_maglev_table_size']) not in MAGLEV_TABLE_SIZES:
+            raise ValueError(f"cilium_maglev_table_size must be one of {MAGLEV_TABLE_SIZES}")
+    # BBR is a mode of the bandwidth manager
+    if settings['cilium_bbr']:
+        settings['cilium_bandwidth_manager'] = True
+    return settings
+
+
+def unsupported_features(inventory_vars, kernels):
+    """Return (feature, minimum kernel) for requested features the oldest kernel lacks."""
+    settings = load_settings(inventory_vars)
+    kernel = oldest_kernel(kernels)
+    if kernel is None:
+        return []
+    return [
+        (feature, '.'.join(map(str, minimum)))
+        for feature, minimum in MIN_KERNEL.items()
+        if settings[feature] and kernel < minimum
+    ]
+
+
+def build_cilium_values(inventory_vars=None, node_count=1, kernels=None):
+    """Return the rke2-cilium chart values for the given vars, node count and kernels."""
+    settings = load_settings(inventory_vars)
+    for feature, _ in unsupported_features(settings, kernels):
+        settings[feature] = False
+
+    values = {
+        'kubeProxyReplacement': True,
+        'k8sServiceHost': '127.0.0.1',
+        'k8sServicePort': '6443',
+        'cni': {'chainingMode': 'none'},   # Cilium is the only CNI
+    }
+
+    if settings['cilium_routing_mode'] == 'native':
+        values['routingMode'] = 'native'
+        values['ipv4NativeRoutingCIDR'] = str(settings['cilium_native_routing_cidr'])
+        values['autoDirectNodeRoutes'] = settings['cilium_auto_direct_node_routes']
+    else:
+        values['routingMode'] = 'tunnel'
+        values['tunnelProtocol'] = settings['cilium_tunnel_protocol']
+
+    if settings['cilium_bpf_masquerade']:
+        values['bpf'] = {'masquerade': True}
+
+    if settings['cilium_bandwidth_manager']:
+        values['bandwidthManager'] = {'enabled': True, 'bbr': settings['cilium_bbr']}
+
+    load_balancer = {}
+    if settings['cilium_xdp_acceleration']:
+        load_balancer['acceleration'] = 'native'
+    if settings['cilium_maglev']:
+        load_balancer['algorithm'] = 'maglev'
+        maglev = {'tableSize': int(settings['cilium_maglev_table_size'] or maglev_table_size(node_count))}
+        if settings['cilium_maglev_hash_seed']:
+            maglev['hashSeed'] = str(settings['cilium_maglev_hash_seed'])
+        values['maglev'] = maglev
+    if load_balancer:
+        values['loadBalancer'] = load_balancer
+
+    if settings['cilium_prometheus']:
+        values['prometheus'] = {'enabled': True}
+        values['operator'] = {'prometheus': {'enabled': True}}
+
+    return values
+
+
+class _ManifestDumper(yaml.SafeDumper):
+    """SafeDumper that writes multi-line strings as literal blocks.
+
+    str subclasses (Ansible's unsafe text from the inventory) are written as
+    plain strings instead of being rejected.
+    """
+
+
+def _represent_str(dumper, value):
+    style = '|' if '\n' in value else None
+    return dumper.represent_scalar('tag:yaml.org,2002:str', value, style=style)
+
+
+_ManifestDumper.add_representer(str, _represent_str)
+_ManifestDumper.add_multi_representer(str, _represent_str)
+
+
+def render_manifest(values):
+    """Return the HelmChartConfig manifest for the rke2-cilium chart values."""
+    manifest = {
+        'apiVersion': 'helm.cattle.io/v1',
+        'kind': 'HelmChartConfig',
+        'metadata': {'name': 'rke2-cilium', 'namespace': 'kube-system'},
+        'spec': {'valuesContent': yaml.dump(values, Dumper=_ManifestDumper, default_flow_style=False, sort_keys=False)},
+    }
+    return yaml.dump(manifest, Dumper=_ManifestDumper, default_flow_style=False, sort_keys=False)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Generate the rke2-cilium HelmChartConfig from the inventory vars.'
+    )
+    parser.add_argument(
+        '-i', '--inventory',
+        default=DEFAULT_INVENTORY,
+        help=f'Inventory file (default: {DEFAULT_INVENTORY})'
+    )
+    parser.add_argument(
+        '--kernel',
+        action='append',
+        default=[],
+        help='Kernel release of a node, e.g. 5.15.0-91-generic (repeatable; the oldest gates features)'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help='Write the manifest to this file instead of stdout'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        index = InventoryIndex.from_file(args.inventory)
+        node_count = len(index.group('control_plane_nodes')) + len(index.group('worker_nodes'))
+        values = build_cilium_values(index.vars, node_count, args.kernel)
+        disabled = unsupported_features(index.vars, args.kernel)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    if not args.kernel:
+        print("Warning: no --kernel given, features are not gated on kernel version", file=sys.stderr)
+    for feature, minimum in disabled:
+        print(f"Warning: {feature} disabled, needs kernel {minimum} or newer", file=sys.stderr)
+
+    manifest = render_manifest(values)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(manifest)
+        print(f"Generated Cilium config: {args.output}")
+    else:
+        print(manifest, end='')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,14 @@ import os
 import ipaddress
 import sys
 
+# hosts.txt host parameters that put an RKE2 directory on its own device.
+# The agent directory needs project quotas; etcd only gains from skipping
+# access time updates on its WAL and snapshot writes.
+MOUNT_DEVICE_KEYS = {
+    'agent_mount_device': ('agent', {'fstype': 'xfs', 'opts': 'defaults,pquota,prjquota'}),
+    'etcd_mount_device': ('etcd', {'fstype': 'xfs', 'opts': 'defaults,noatime'}),
+}
+
 def validate_node_data(nodes):
     """Validate node data format and IP addresses."""
     for hostname, ip in nodes:
@@ -168,16 +176,10 @@ def generate_node_vars(node):
     vars = {}
     # ... existing code ...
     
-    # Add mount configuration if device is specified
-    if node.get('agent_mount_device'):
-        vars['mounts'] = {
-            'agent': {
-                'enabled': True,
-                'device': node['agent_mount_device'],
-                'fstype': 'xfs',
-                'opts': 'defaults,pquota,prjquota'
-            }
-        }
+    # Add mount configuration for each device that is specified
+    for key, (mount_name, mount) in MOUNT_DEVICE_KEYS.items():
+        if node.get(key):
+            vars.setdefault('mounts', {})[mount_name] = dict(mount, enabled=True, device=node[key])
     
     return vars
 
@@ -195,19 +197,20 @@ def parse_host_line(line):
         for part in parts[1:]:  # Start from part 1 to catch all parameters
             if '=' in part:
                 key, value = part.split('=', 1)
-                if key == 'agent_mount_device':
-                    host_vars['mounts'] = {
-                        'agent': {
-                            'enabled': True,
-                            'device': value,
-                            'fstype': 'xfs',
-                            'opts': 'defaults,pquota,prjquota'
-                        }
-                    }
+                if key in MOUNT_DEVICE_KEYS:
+                    mount_name, mount = MOUNT_DEVICE_KEYS[key]
+                    host_vars.setdefault('mounts', {})[mount_name] = dict(mount, enabled=True, device=value)
     
     return hostname, host_vars
 
 def generate_inventory(hosts_file):
+    with open(hosts_file, 'r') as f:
+        lines = f.readlines()
+    
+    return generate_inventory_from_lines(lines)
+
+def generate_inventory_from_lines(lines):
+    """Build the inventory structure from the lines of a hosts.txt file."""
     inventory = {
         'all': {
             'children': {
@@ -225,9 +228,6 @@ def generate_inventory(hosts_file):
     ip_mappings = {}
     current_group = None
     
-    with open(hosts_file, 'r') as f:
-        lines = f.readlines()
-    
     for line in lines:
         line = line.strip()
         if not line or line.startswith('#'):
@@ -4,6 +4,11 @@ import yaml
 import os
 from datetime import datetime
 
+try:
+    from scripts.inventory_index import InventoryIndex
+except ImportError:
+    from inventory_index import InventoryIndex
+
 def generate_base_vars(inventory_data):
     """Generate essential variables including RKE2 configuration."""
     base_vars = {
@@ -67,6 +72,14 @@ def validate_inventory_data(inventory_data):
             current = current[field]
     return True
 
+def check_duplicate_ips(inventory_data):
+    """Fail if more than one host uses the same ansible_host IP"""
+    duplicates = InventoryIndex(inventory_data).duplicate_ips()
+    if duplicates:
+        details = ', '.join(f"{ip} ({', '.join(hosts)})" for ip, hosts in sorted(duplicates.items()))
+        raise ValueError(f"Duplicate IP addresses in inventory: {details}")
+    return True
+
 def write_group_vars(vars_data):
     """Write only essential variables to group_vars/all.yml"""
     os.makedirs('inventory/group_vars', exist_ok=True)
@@ -80,6 +93,7 @@ def main():
 
     # Validate inventory
     validate_inventory_data(inventory_data)
+    check_duplicate_ips(inventory_data)
 
     # Generate base variables
     vars_data = generate_base_vars(inventory_data)
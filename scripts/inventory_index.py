@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Indexed, read-only view of the generated RKE2 inventory.
+
+The inventory is walked once and kept in flat dictionaries so scripts can
+look hosts up by name, IP, group or mount device without re-walking the
+nested YAML structure.
+"""
+
+import argparse
+import json
+import sys
+
+try:
+    from scripts.fix_yaml import load_yaml
+except ImportError:
+    from fix_yaml import load_yaml
+
+DEFAULT_INVENTORY = 'inventory/rke2.yml'
+
+
+class InventoryIndex:
+    """Hosts, groups and mounts of an inventory indexed for O(1) lookups."""
+
+    def __init__(self, inventory_data):
+        self.vars = {}
+        self.hosts = {}          # host name -> merged host vars
+        self.groups = {}         # group name -> list of host names (recursive)
+        self.children = {}       # group name -> list of direct child groups
+        self.host_groups = {}    # host name -> list of group names
+        self.group_vars = {}     # group name -> vars of the group itself
+        self.depth = {}          # group name -> distance from 'all'
+        self.by_ip = {}          # ip -> list of host names
+        self.by_device = {}      # device -> list of (host name, mount name)
+
+        root = (inventory_data or {}).get('all') or {}
+        self.vars = dict(root.get('vars') or {})
+        self._walk('all', root)
+
+    def _walk(self, group_name, group, depth=0):
+        """Index a group and return the set of hosts it contains."""
+        group = group or {}
+        members = []
+        seen = set()
+        self.group_vars.setdefault(group_name, {}).update(group.get('vars') or {})
+        self.depth[group_name] = max(self.depth.get(group_name, 0), depth)
+
+        for hostname, host_vars in (group.get('hosts') or {}).items():
+            host_vars = host_vars or {}
+            merged = self.hosts.setdefault(hostname, {})
+            merged.update(host_vars)
+            self._index_host(hostname, host_vars)
+            if hostname not in seen:
+                seen.add(hostname)
+                members.append(hostname)
+
+        self.children[group_name] = list((group.get('children') or {}).keys())
+        for child_name, child in (group.get('children') or {}).items():
+            for hostname in self._walk(child_name, child, depth + 1):
+                if hostname not in seen:
+                    seen.add(hostname)
+                    members.append(hostname)
+
+        self.groups[group_name] = members
+        for hostname in members:
+            groups = self.host_groups.setdefault(hostname, [])
+            if group_name not in groups:
+                groups.append(group_name)
+        return members
+
+    def _index_host(self, hostname, host_vars):
+        """Add a host's IP and mount devices to the lookup tables."""
+        ip = host_vars.get('ansible_host')
+        if ip:
+            names = self.by_ip.setdefault(ip, [])
+            if hostname not in names:
+                names.append(hostname)
+
+        for mount_name, mount in (host_vars.get('mounts') or {}).items():
+            device = (mount or {}).get('device')
+            if device:
+                entries = self.by_device.setdefault(device, [])
+                if (hostname, mount_name) not in entries:
+                    entries.append((hostname, mount_name))
+
+    @classmethod
+    def from_file(cls, file_path=DEFAULT_INVENTORY):
+        """Build an index from an inventory YAML file."""
+        with open(file_path, 'rb') as f:
+            data, _ = load_yaml(f)
+        return cls(data)
+
+    def host(self, hostname):
+        """Return the vars of a host, or None."""
+        return self.hosts.get(hostname)
+
+    def hosts_by_ip(self, ip):
+        """Return host names using an IP address."""
+        return list(self.by_ip.get(ip, []))
+
+    def group(self, group_name):
+        """Return all host names in a group, including child groups."""
+        return list(self.groups.get(group_name, []))
+
+    def groups_of(self, hostname):
+        """Return the groups a host belongs to."""
+        return list(self.host_groups.get(hostname, []))
+
+    def hosts_by_device(self, device):
+        """Return (host, mount name) pairs using a mount device."""
+        return list(self.by_device.get(device, []))
+
+    def duplicate_ips(self):
+        """Return IPs used by more than one host."""
+        return {ip: names for ip, names in self.by_ip.items() if len(names) > 1}
+
+    def hostvars(self, hostname):
+        """Return the vars Ansible would give a host.
+
+        Group vars are applied as Ansible does: parent groups before their
+        children, then by ansible_group_priority and name. The host's own
+        vars win over all of them.
+        """
+        if hostname not in self.hosts:
+            return None
+        groups = sorted(
+            self.host_groups[hostname],
+            key=lambda name: (self.depth[name], self.group_vars[name].get('ansible_group_priority', 1), name)
+        )
+        merged = {}
+        for group_name in groups:
+            merged.update(self.group_vars[group_name])
+        merged.update(self.hosts[hostname])
+        return merged
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Query the RKE2 inventory by host, IP, group or mount device.'
+    )
+    parser.add_argument(
+        '-i', '--inventory',
+        default=DEFAULT_INVENTORY,
+        help=f'Inventory file (default: {DEFAULT_INVENTORY})'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('host', help='Show the vars of a host, merged across its groups').add_argument('name')
+    subparsers.add_parser('ip', help='Show hosts using an IP').add_argument('address')
+    subparsers.add_parser('group', help='List hosts in a group').add_argument('name')
+    subparsers.add_parser('device', help='List hosts mounting a device').add_argument('device')
+    subparsers.add_parser('groups', help='List groups and their hosts')
+    subparsers.add_parser('duplicates', help='Report IPs used by more than one host')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    index = InventoryIndex.from_file(args.inventory)
+
+    if args.command == 'host':
+        result = index.hostvars(args.name)
+    elif args.command == 'ip':
+        result = index.hosts_by_ip(args.address)
+    elif args.command == 'group':
+        result = index.group(args.name) if args.name in index.groups else None
+    elif args.command == 'device':
+        result = [{'host': host, 'mount': mount} for host, mount in index.hosts_by_device(args.device)]
+    elif args.command == 'groups':
+        result = index.groups
+    else:
+        result = index.duplicate_ips()
+
+    if result is None:
+        print(f"Error: '{getattr(args, 'name', '')}' not found in {args.inventory}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(result, indent=2))
+    if args.command == 'duplicates' and result:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
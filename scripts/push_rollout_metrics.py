@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Push per-node rollout durations to a Prometheus Pushgateway.
+
+The playbooks time the install, join and upgrade phase of every node and
+push one group per node and phase:
+
+    <url>/metrics/job/rke2_rollout/node/<node>/phase/<phase>
+
+so a later push for the same node and phase replaces the earlier one and
+leaves the others alone. The same can be done by hand:
+
+    python3 scripts/push_rollout_metrics.py --url http://10.0.0.1:30091 \\
+        --node k2 --phase upgrade --seconds 184.2
+"""
+
+import argparse
+import base64
+import sys
+import time
+import urllib.parse
+import urllib.request
+
+DEFAULT_JOB = 'rke2_rollout'
+PHASES = ('install', 'join', 'upgrade')
+
+
+def format_metrics(seconds, finished=None, result='success'):
+    """Return the Prometheus text exposition for one node and phase.
+
+    Node and phase are not labels here: the Pushgateway adds them from the
+    grouping key of the push URL.
+    """
+    finished = time.time() if finished in (None, '') else float(finished)
+    lines = [
+        '# HELP rke2_rollout_phase_duration_seconds Wall time of the last run of this rollout phase.',
+        '# TYPE rke2_rollout_phase_duration_seconds gauge',
+        f'rke2_rollout_phase_duration_seconds {float(seconds):.3f}',
+        '# HELP rke2_rollout_phase_completed_timestamp_seconds When the last run of this rollout phase ended.',
+        '# TYPE rke2_rollout_phase_completed_timestamp_seconds gauge',
+        f'rke2_rollout_phase_completed_timestamp_seconds {finished:.3f}',
+        '# HELP rke2_rollout_phase_success Whether the last run of this rollout phase succeeded.',
+        '# TYPE rke2_rollout_phase_success gauge',
+        f'rke2_rollout_phase_success {1 if result == "success" else 0}',
+    ]
+    # The Pushgateway rejects a body whose last line is not terminated
+    return '\n'.join(lines) + '\n'
+
+
+def grouping_segment(label, value):
+    """Return the URL path segment for one grouping key label.
+
+    The Pushgateway splits the path on '/' before decoding it, so a value
+    containing one is sent in its @base64 form instead.
+    """
+    value = str(value)
+    if '/' in value:
+        return f"{label}@base64/{base64.urlsafe_b64encode(value.encode()).decode()}"
+    return f"{label}/{urllib.parse.quote(value, safe='')}"
+
+
+def push_url(url, node, phase, job=DEFAULT_JOB):
+    """Return the Pushgateway URL of the group for one node and phase."""
+    if phase not in PHASES:
+        raise ValueError(f"phase must be one of {', '.join(PHASES)}: {phase}")
+    if not node:
+        raise ValueError("node must not be empty")
+    path = '/'.join(grouping_segment(label, value) for label, value in (('job', job), ('node', node), ('phase', phase)))
+    return f"{url.strip().rstrip('/')}/metrics/{path}"
+
+
+def push(url, node, phase, seconds, finished=None, result='success', job=DEFAULT_JOB, timeout=10):
+    """PUT the metrics for one node and phase, replacing the previous group."""
+    request = urllib.request.Request(
+        push_url(url, node, phase, job),
+        data=format_metrics(seconds, finished, result).encode(),
+        method='PUT',
+        headers={'Content-Type': 'text/plain; version=0.0.4'},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Push a node rollout duration to a Prometheus Pushgateway.')
+    parser.add_argument('--url', required=True, help='Pushgateway base URL, e.g. http://10.0.0.1:30091')
+    parser.add_argument('--node', required=True, help='Node name (inventory hostname)')
+    parser.add_argument('--phase', required=True, choices=PHASES, help='Rollout phase')
+    parser.add_argument('--seconds', required=True, type=float, help='Duration of the phase')
+    parser.add_argument('--finished', type=float, help='Unix time the phase ended (default: now)')
+    parser.add_argument('--failed', action='store_true', help='Record the phase as failed')
+    parser.add_argument('--job', default=DEFAULT_JOB, help=f'Pushgateway job name (default: {DEFAULT_JOB})')
+    parser.add_argument('--dry-run', action='store_true', help='Print the URL and payload instead of pushing')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = 'failed' if args.failed else 'success'
+    if args.dry_run:
+        print(push_url(args.url, args.node, args.phase, args.job))
+        print(format_metrics(args.seconds, args.finished, result), end='')
+        return 0
+    try:
+        push(args.url, args.node, args.phase, args.seconds, args.finished, result, args.job)
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    print(f"Pushed {args.phase} duration of {args.node}: {args.seconds:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
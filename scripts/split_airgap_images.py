@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Split an RKE2 airgap image archive into one archive per image.
+
+rke2-images.linux-<arch>.tar.zst is a docker-save style tarball holding every
+image RKE2 may need. Splitting it lets each node receive only the images for
+its role, and containerd then logs a separate import time per archive.
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROLES = ('control_plane', 'worker')
+
+# Images only ever scheduled on control plane nodes
+DEFAULT_CONTROL_PLANE_ONLY = ['hardened-etcd']
+
+
+def image_file_name(repo_tags, index):
+    """Return a filesystem-safe archive name for an image."""
+    if not repo_tags:
+        return f"image-{index:03d}"
+    name = repo_tags[0].split('/', 1)[-1] if '.' in repo_tags[0].split('/', 1)[0] else repo_tags[0]
+    return re.sub(r'[^A-Za-z0-9_.-]+', '-', name).strip('-')
+
+
+def image_roles(repo_tags, control_plane_only):
+    """Return the node roles that need an image."""
+    for tag in repo_tags or []:
+        if any(pattern in tag for pattern in control_plane_only):
+            return ['control_plane']
+    return list(ROLES)
+
+
+def decompress(src, dest_dir):
+    """Return a path to an uncompressed tar of src, decompressing if needed."""
+    if not src.endswith('.zst'):
+        return src, False
+
+    fd, tar_path = tempfile.mkstemp(dir=dest_dir, suffix='.tar')
+    os.close(fd)
+    try:
+        import zstandard
+        with open(src, 'rb') as fsrc, open(tar_path, 'wb') as fdst:
+            zstandard.ZstdDecompressor().copy_stream(fsrc, fdst)
+    except ImportError:
+        subprocess.run(['zstd', '-d', '-q', '-f', src, '-o', tar_path], check=True)
+    return tar_path, True
+
+
+def compress(path):
+    """Compress a file with zstd, returning the new path (or the original if zstd is missing)."""
+    if shutil.which('zstd') is None:
+        return path
+    subprocess.run(['zstd', '-q', '-T0', '--rm', '-f', path, '-o', path + '.zst'], check=True)
+    return path + '.zst'
+
+
+def read_manifest(archive):
+    """Return the docker-save manifest entries of an open tar archive."""
+    try:
+        member = archive.getmember('manifest.json')
+    except KeyError:
+        raise ValueError("Archive has no manifest.json; only docker-save archives are supported")
+    return json.load(archive.extractfile(member))
+
+
+def image_members(archive, entry):
+    """Return the tar members making up one image."""
+    wanted = {entry['Config']}
+    prefixes = set()
+    for layer in entry['Layers']:
+        wanted.add(layer)
+        # Legacy layout keeps layer metadata next to <id>/layer.tar
+        if layer.endswith('/layer.tar'):
+            prefixes.add(layer[:-len('layer.tar')])
+
+    members = []
+    for member in archive.getmembers():
+        if member.name in wanted or any(member.name.startswith(p) for p in prefixes):
+            members.append(member)
+    return members
+
+
+def write_image_archive(archive, entry, path):
+    """Write a single-image docker-save archive."""
+    with tarfile.open(path, 'w') as out:
+        for member in image_members(archive, entry):
+            out.addfile(member, archive.extractfile(member) if member.isfile() else None)
+        manifest = json.dumps([entry]).encode()
+        info = tarfile.TarInfo('manifest.json')
+        info.size = len(manifest)
+        out.addfile(info, io.BytesIO(manifest))
+
+
+def split_archive(src, output_dir, control_plane_only=None, compress_output=True):
+    """Split src into per-image archives in output_dir and write index.json."""
+    control_plane_only = DEFAULT_CONTROL_PLANE_ONLY if control_plane_only is None else control_plane_only
+    os.makedirs(output_dir, exist_ok=True)
+
+    tar_path, is_temp = decompress(src, output_dir)
+    images = []
+    try:
+        with tarfile.open(tar_path, 'r') as archive:
+            for index, entry in enumerate(read_manifest(archive)):
+                name = image_file_name(entry.get('RepoTags'), index)
+                path = os.path.join(output_dir, name + '.tar')
+                write_image_archive(archive, entry, path)
+                if compress_output:
+                    path = compress(path)
+                images.append({
+                    'file': os.path.basename(path),
+                    'tags': entry.get('RepoTags') or [],
+                    'roles': image_roles(entry.get('RepoTags'), control_plane_only),
+                    'size': os.path.getsize(path),
+                })
+    finally:
+        if is_temp:
+            os.unlink(tar_path)
+
+    index = {'source': os.path.basename(src), 'images': images}
+    with open(os.path.join(output_dir, 'index.json'), 'w') as f:
+        json.dump(index, f, indent=2)
+    return index
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Split an RKE2 airgap image archive into per-image archives.'
+    )
+    parser.add_argument('archive', help='rke2-images.linux-<arch>.tar.zst (or an uncompressed .tar)')
+    parser.add_argument(
+        '-o', '--output',
+        required=True,
+        help='Directory for the per-image archives and index.json'
+    )
+    parser.add_argument(
+        '--control-plane-only',
+        action='append',
+        metavar='PATTERN',
+        help='Image name pattern only needed on control plane nodes (repeatable, '
+             f'default: {", ".join(DEFAULT_CONTROL_PLANE_ONLY)})'
+    )
+    parser.add_argument(
+        '--no-control-plane-only',
+        action='store_const',
+        const=[],
+        dest='control_plane_only',
+        help='Start from an empty pattern list instead of the default; '
+             'later --control-plane-only options add to it'
+    )
+    parser.add_argument(
+        '--no-compress',
+        action='store_true',
+        help='Leave the per-image archives uncompressed'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        index = split_archive(
+            args.archive,
+            args.output,
+            control_plane_only=args.control_plane_only,
+            compress_output=not args.no_compress,
+        )
+    except (OSError, ValueError, tarfile.TarError, subprocess.CalledProcessError) as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    for image in index['images']:
+        print(f"{image['file']:<60} {','.join(image['roles'])}")
+    print(f"Split {len(index['images'])} images into {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+"""Benchmarks for inventory YAML validation."""
+
+import os
+
+import yaml
+
+from scripts.fix_yaml import fix_yaml_file
+from tests.benchmarks import synthetic
+
+Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+def bench_fix_yaml_file(size, workdir):
+    path = os.path.join(workdir, f"rke2_{size}.yml")
+    with open(path, 'w') as f:
+        yaml.dump(synthetic.inventory_data(size), f, Dumper=Dumper, default_flow_style=False)
+    return lambda: fix_yaml_file(path)
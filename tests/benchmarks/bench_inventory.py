@@ -0,0 +1,35 @@
+"""Benchmarks for hosts.txt parsing and inventory generation."""
+
+import contextlib
+import io
+import os
+
+from scripts.generate_inventory import generate_inventory, parse_hosts_file, write_inventory_file
+from scripts.generate_rke2_configs import generate_base_vars
+from tests.benchmarks import synthetic
+
+
+def bench_generate_inventory(size, workdir):
+    hosts_file = synthetic.write_hosts_file(workdir, size)
+    return lambda: generate_inventory(hosts_file)
+
+
+def bench_parse_hosts_file(size, workdir):
+    hosts_file = synthetic.write_hosts_file(workdir, size)
+
+    def run():
+        # parse_hosts_file prints warnings about unset variables
+        with contextlib.redirect_stdout(io.StringIO()):
+            parse_hosts_file(hosts_file)
+    return run
+
+
+def bench_write_inventory_file(size, workdir):
+    data = synthetic.inventory_data(size)
+    output = os.path.join(workdir, 'inventory', f"rke2_{size}.yml")
+    return lambda: write_inventory_file(data, output)
+
+
+def bench_generate_base_vars(size, workdir):
+    data = synthetic.inventory_data(size)
+    return lambda: generate_base_vars(data)
@@ -0,0 +1,47 @@
+"""Benchmarks for config.yaml.j2 rendering and the Jinja syntax checker."""
+
+import contextlib
+import io
+import os
+
+import yaml
+from jinja2 import Environment, FileSystemLoader
+
+import find_jinja_error
+from tests.benchmarks import synthetic
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ROLE_DIR = os.path.join(REPO_ROOT, 'roles', 'rke2_cluster')
+
+
+def bench_render_config_template(size, workdir):
+    """Render config.yaml.j2 for the last host; tls-san lists every host."""
+    groups = synthetic.inventory_data(size)['all']['children']['six_node_cluster']['children']
+    control_planes = groups['control_plane_nodes']['hosts']
+    workers = groups['worker_nodes']['hosts']
+    with open(os.path.join(ROLE_DIR, 'defaults', 'main.yml')) as f:
+        defaults = yaml.safe_load(f)
+
+    template = Environment(loader=FileSystemLoader(os.path.join(ROLE_DIR, 'templates'))).get_template('config.yaml.j2')
+    template_vars = {
+        'inventory_hostname': list(workers)[-1] if workers else list(control_planes)[-1],
+        'groups': {'control_plane_nodes': list(control_planes), 'worker_nodes': list(workers)},
+        'hostvars': dict(control_planes, **workers),
+        'rke2_config': {'write_kubeconfig_mode': '0644'},
+        'rke2_token': 'bench-token',
+        'rke2_performance_profile': 'medium',
+        'rke2_performance_profiles': defaults['rke2_performance_profiles'],
+        'rke2_performance_profile_thresholds': defaults['rke2_performance_profile_thresholds'],
+    }
+    return lambda: template.render(**template_vars)
+
+
+def bench_check_all_files(size, workdir):
+    """Scan the role directory for Jinja syntax errors (does not depend on size)."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            find_jinja_error.check_all_files(os.path.join(REPO_ROOT, 'roles'))
+    return run
+
+
+bench_check_all_files.sized = False
@@ -0,0 +1,79 @@
+"""Timing, peak memory and baseline comparison for the benchmarks."""
+
+import gc
+import json
+import time
+import tracemalloc
+
+# A result regresses when it is worse than the baseline by more than the
+# relative tolerance AND by more than the absolute floor, so sub-millisecond
+# timings and small allocations do not flap.
+DEFAULT_TIME_TOLERANCE = 0.5
+DEFAULT_MEMORY_TOLERANCE = 0.2
+TIME_FLOOR_SECONDS = 0.005
+MEMORY_FLOOR_KIB = 256
+
+
+def measure(func, repeat=3):
+    """Return the best wall time of repeat runs and the peak traced memory of one run."""
+    timings = []
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': round(min(timings), 6), 'peak_kib': round(peak / 1024, 1)}
+
+
+def compare(results, baseline, time_tolerance=DEFAULT_TIME_TOLERANCE,
+            memory_tolerance=DEFAULT_MEMORY_TOLERANCE):
+    """Return a list of regression messages for results measured against baseline.
+
+    Benchmarks missing from the baseline are not regressions.
+    """
+    regressions = []
+    checks = (
+        ('seconds', time_tolerance, TIME_FLOOR_SECONDS, 's'),
+        ('peak_kib', memory_tolerance, MEMORY_FLOOR_KIB, ' KiB'),
+    )
+    for key, result in sorted(results.items()):
+        expected = baseline.get(key)
+        if not expected:
+            continue
+        for metric, tolerance, floor, unit in checks:
+            if metric not in expected:
+                continue
+            limit = expected[metric] + max(expected[metric] * tolerance, floor)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{key}: {metric} {result[metric]}{unit} > {limit:.6g}{unit} "
+                    f"(baseline {expected[metric]}{unit})"
+                )
+    return regressions
+
+
+def load_baseline(path):
+    """Return the stored results of a baseline file, or {} if there is none."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get('results', {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, results, metadata=None):
+    """Store results as the new baseline."""
+    data = dict(metadata or {})
+    data['results'] = dict(sorted(results.items()))
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
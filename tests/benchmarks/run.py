@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Run the bench_*.py benchmarks and compare them with the stored baseline.
+
+    python3 -m tests.benchmarks.run                    # compare, exit 1 on regression
+    python3 -m tests.benchmarks.run --update-baseline  # store new baseline
+
+Sizes default to 10, 1000 and 10000 hosts. The 100k tier takes several
+minutes and is opt-in: BENCH_SIZES=10,1000,10000,100000.
+
+Each bench_* function takes (size, workdir), does its setup and returns the
+callable to measure. Functions with a false 'sized' attribute run once.
+"""
+
+import argparse
+import glob
+import importlib
+import os
+import platform
+import sys
+import tempfile
+
+from tests.benchmarks.harness import (
+    DEFAULT_MEMORY_TOLERANCE,
+    DEFAULT_TIME_TOLERANCE,
+    compare,
+    load_baseline,
+    measure,
+    save_baseline,
+)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_SIZES = '10,1000,10000'
+
+
+def discover(pattern=None):
+    """Return (name, function) for every bench_* function in bench_*.py modules."""
+    benchmarks = []
+    for path in sorted(glob.glob(os.path.join(BENCH_DIR, 'bench_*.py'))):
+        module = importlib.import_module(f"tests.benchmarks.{os.path.basename(path)[:-3]}")
+        for name in sorted(dir(module)):
+            func = getattr(module, name)
+            if name.startswith('bench_') and callable(func):
+                short_name = name[len('bench_'):]
+                if pattern is None or pattern in short_name:
+                    benchmarks.append((short_name, func))
+    return benchmarks
+
+
+def run_benchmarks(benchmarks, sizes, repeat):
+    """Run every benchmark at every size and return {'name[size]': result}."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='rke2-bench-') as workdir:
+        for name, setup in benchmarks:
+            for size in (sizes if getattr(setup, 'sized', True) else ['repo']):
+                key = f"{name}[{size}]"
+                func = setup(size, workdir)
+                # Large inputs are slow enough that one timed run is representative
+                result = measure(func, repeat=repeat if size == 'repo' or size <= 10000 else 1)
+                results[key] = result
+                print(f"{key:<40} {result['seconds'] * 1000:>12.2f} ms {result['peak_kib']:>12.1f} KiB",
+                      flush=True)
+    return results
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description='Run the tooling benchmarks.')
+    parser.add_argument(
+        '--sizes',
+        default=os.environ.get('BENCH_SIZES', DEFAULT_SIZES),
+        help=f'Comma separated host counts (default: {DEFAULT_SIZES}, or $BENCH_SIZES)'
+    )
+    parser.add_argument('-k', dest='pattern', help='Only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark (best is kept)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument(
+        '--time-tolerance',
+        type=float,
+        default=DEFAULT_TIME_TOLERANCE,
+        help=f'Allowed relative slowdown (default: {DEFAULT_TIME_TOLERANCE})'
+    )
+    parser.add_argument(
+        '--memory-tolerance',
+        type=float,
+        default=DEFAULT_MEMORY_TOLERANCE,
+        help=f'Allowed relative peak memory growth (default: {DEFAULT_MEMORY_TOLERANCE})'
+    )
+    parser.add_argument(
+        '--update-baseline',
+        action='store_true',
+        help='Store the results as the new baseline instead of comparing'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    benchmarks = discover(args.pattern)
+    if not benchmarks:
+        print("Error: no benchmarks selected", file=sys.stderr)
+        return 1
+
+    results = run_benchmarks(benchmarks, sizes, args.repeat)
+
+    if args.update_baseline:
+        stored = load_baseline(args.baseline)
+        stored.update(results)
+        save_baseline(args.baseline, stored, {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+        })
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare(results, load_baseline(args.baseline), args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        return 1
+    print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
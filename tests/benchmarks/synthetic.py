@@ -0,0 +1,58 @@
+"""Synthetic inventories for the benchmarks.
+
+Hosts get unique IPs from 10.0.0.0/8, every fourth worker carries an
+agent_mount_device annotation and the [vars] section holds extra variables,
+so the parsers see the same shapes as a real hosts.txt, just more of them.
+"""
+
+import ipaddress
+import os
+
+try:
+    from scripts.generate_inventory import generate_inventory_from_lines
+except ImportError:
+    from generate_inventory import generate_inventory_from_lines
+
+CONTROL_PLANE_COUNT = 3
+EXTRA_VARS = 50
+MOUNT_EVERY = 4
+
+_BASE_IP = int(ipaddress.ip_address('10.0.0.1'))
+
+
+def host_names(size):
+    """Return (control plane names, worker names) for a cluster of size hosts."""
+    control_planes = [f"k{i + 1}" for i in range(min(CONTROL_PLANE_COUNT, size))]
+    workers = [f"node{i + 1}" for i in range(size - len(control_planes))]
+    return control_planes, workers
+
+
+def hosts_txt_lines(size, extra_vars=EXTRA_VARS, mount_every=MOUNT_EVERY):
+    """Return the lines of a hosts.txt file describing size hosts."""
+    control_planes, workers = host_names(size)
+    lines = ['[vars]', 'ssh_public_key_path=~/.ssh/id_ed25519.pub', 'rke2_version=v1.31.4+rke2r1']
+    lines.extend(f"bench_var_{i}=value-{i}" for i in range(extra_vars))
+
+    lines.extend(['', '# Synthetic cluster', '[six_node]'])
+    for index, name in enumerate(control_planes + workers):
+        line = f"{name} {ipaddress.ip_address(_BASE_IP + index)}"
+        if name in workers and mount_every and index % mount_every == 0:
+            line += " agent_mount_device=/dev/sdb1"
+        lines.append(line)
+
+    lines.extend(['', '[control_plane_nodes]'] + control_planes)
+    lines.extend(['', '[worker_nodes]'] + workers)
+    return lines
+
+
+def write_hosts_file(directory, size, **kwargs):
+    """Write a synthetic hosts.txt into directory and return its path."""
+    path = os.path.join(directory, f"hosts_{size}.txt")
+    with open(path, 'w') as f:
+        f.write('\n'.join(hosts_txt_lines(size, **kwargs)) + '\n')
+    return path
+
+
+def inventory_data(size, **kwargs):
+    """Return the inventory structure generated from a synthetic hosts.txt."""
+    return generate_inventory_from_lines(hosts_txt_lines(size, **kwargs))
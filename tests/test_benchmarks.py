@@ -0,0 +1,52 @@
+import json
+from scripts.generate_inventory import generate_inventory
+from tests.benchmarks import synthetic
+from tests.benchmarks.harness import compare, load_baseline, measure, save_baseline
+from tests.benchmarks.run import discover
+
+def test_synthetic_inventory(tmp_path):
+    """Test that synthetic hosts files parse into the requested number of hosts"""
+    hosts_file = synthetic.write_hosts_file(str(tmp_path), 50)
+    inventory = generate_inventory(hosts_file)
+    groups = inventory['all']['children']['six_node_cluster']['children']
+    assert len(groups['control_plane_nodes']['hosts']) == 3
+    assert len(groups['worker_nodes']['hosts']) == 47
+    assert sum('mounts' in h for h in groups['worker_nodes']['hosts'].values()) > 0
+    assert inventory['all']['vars']['bench_var_0'] == 'value-0'
+
+def test_measure():
+    """Test that measure reports time and peak memory"""
+    result = measure(lambda: bytearray(1024 * 1024), repeat=2)
+    assert result['seconds'] >= 0
+    assert result['peak_kib'] >= 1024
+
+def test_compare():
+    """Test regression detection with relative tolerance and absolute floors"""
+    baseline = {
+        'a[10]': {'seconds': 1.0, 'peak_kib': 10000},
+        'b[10]': {'seconds': 0.0001, 'peak_kib': 10},
+    }
+    assert compare({'a[10]': {'seconds': 1.4, 'peak_kib': 11000}}, baseline) == []
+    regressions = compare({'a[10]': {'seconds': 1.6, 'peak_kib': 13000}}, baseline)
+    assert len(regressions) == 2
+    # Tiny timings and allocations stay under the floors
+    assert compare({'b[10]': {'seconds': 0.001, 'peak_kib': 100}}, baseline) == []
+    # New benchmarks are not regressions
+    assert compare({'c[10]': {'seconds': 9.0, 'peak_kib': 1}}, baseline) == []
+
+def test_baseline_round_trip(tmp_path):
+    """Test storing and loading a baseline"""
+    path = str(tmp_path / 'baseline.json')
+    assert load_baseline(path) == {}
+    save_baseline(path, {'a[10]': {'seconds': 1.0, 'peak_kib': 1.0}}, {'python': '3.11'})
+    assert load_baseline(path) == {'a[10]': {'seconds': 1.0, 'peak_kib': 1.0}}
+    with open(path) as f:
+        assert json.load(f)['python'] == '3.11'
+
+def test_discover_benchmarks():
+    """Test that every requested function has a benchmark"""
+    names = {name for name, _ in discover()}
+    assert {
+        'generate_inventory', 'parse_hosts_file', 'write_inventory_file', 'generate_base_vars',
+        'fix_yaml_file', 'render_config_template', 'check_all_files'
+    } <= names
@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import json
+import os
+import pytest
+import yaml
+from scripts.build_package_index import (
+    build_index,
+    format_packages,
+    missing_packages,
+    parse_control,
+    write_index
+)
+
+CONTROLS = {
+    'curl_8.5.0-2ubuntu10_amd64.deb': """Package: curl
+Version: 8.5.0-2ubuntu10
+Architecture: amd64
+Depends: libc6 (>= 2.34), libcurl4t64 (= 8.5.0-2ubuntu10), zlib1g (>= 1:1.1.4)
+Description: command line tool for transferring data with URL syntax
+ curl is a command line tool for transferring data with URL syntax,
+ supporting DICT, FILE, FTP, FTPS, GOPHER, HTTP, HTTPS.
+""",
+    'libcurl4t64_8.5.0-2ubuntu10_amd64.deb': """Package: libcurl4t64
+Version: 8.5.0-2ubuntu10
+Architecture: amd64
+Provides: libcurl4 (= 8.5.0-2ubuntu10)
+Description: easy-to-use client-side URL transfer library
+""",
+}
+
+def fake_reader(path):
+    return CONTROLS[path.rsplit('/', 1)[-1]]
+
+@pytest.fixture
+def bundle_dir(tmp_path):
+    for name in CONTROLS:
+        (tmp_path / name).write_bytes(name.encode() * 10)
+    (tmp_path / 'README').write_text('not a package')
+    return tmp_path
+
+def test_parse_control_keeps_continuation_lines():
+    """Test that multi-line descriptions stay attached to their field"""
+    fields = parse_control(CONTROLS['curl_8.5.0-2ubuntu10_amd64.deb'])
+    assert fields['Package'] == 'curl'
+    assert fields['Depends'].startswith('libc6 (>= 2.34)')
+    assert fields['Description'].count('\n') == 2
+    assert list(fields)[0] == 'Package'
+
+def test_build_index(bundle_dir):
+    """Test that each .deb gets its control fields, file name, size and checksums"""
+    entries = build_index(str(bundle_dir), read_control=fake_reader)
+    assert [e['Package'] for e in entries] == ['curl', 'libcurl4t64']
+
+    curl = entries[0]
+    content = (bundle_dir / 'curl_8.5.0-2ubuntu10_amd64.deb').read_bytes()
+    assert curl['Filename'] == './curl_8.5.0-2ubuntu10_amd64.deb'
+    assert curl['Size'] == str(len(content))
+    assert curl['SHA256'] == hashlib.sha256(content).hexdigest()
+    assert curl['MD5sum'] == hashlib.md5(content).hexdigest()
+
+def test_build_index_rejects_bad_control(tmp_path):
+    """Test that a package without a Package field is an error"""
+    (tmp_path / 'broken.deb').write_bytes(b'x')
+    with pytest.raises(ValueError):
+        build_index(str(tmp_path), read_control=lambda path: "Version: 1.0\n")
+
+def test_write_index(bundle_dir):
+    """Test Packages, Packages.gz and index.json output"""
+    entries = build_index(str(bundle_dir), read_control=fake_reader)
+    summary = write_index(str(bundle_dir), entries, requested=['curl', 'libcurl4'])
+
+    packages = (bundle_dir / 'Packages').read_text()
+    assert packages == format_packages(entries)
+    assert gzip.decompress((bundle_dir / 'Packages.gz').read_bytes()).decode() == packages
+    stanzas = [parse_control(s) for s in packages.strip().split('\n\n')]
+    assert [s['Package'] for s in stanzas] == ['curl', 'libcurl4t64']
+    assert stanzas[0]['Description'].endswith('HTTP, HTTPS.')
+
+    assert summary['missing'] == []
+    with open(bundle_dir / 'index.json') as f:
+        index = json.load(f)
+    assert index['packages'][0]['filename'] == 'curl_8.5.0-2ubuntu10_amd64.deb'
+    assert index['total_size'] == sum(p['size'] for p in index['packages'])
+
+def test_missing_packages():
+    """Test that requested packages must be provided by name or Provides"""
+    entries = [parse_control(text) for text in CONTROLS.values()]
+    assert missing_packages(entries, ['curl', 'libcurl4', 'gnupg']) == ['gnupg']
+    assert missing_packages(entries, None) == []
+
+def included_task_files(tasks_dir, name, seen=None):
+    """Return the task files reachable from name through include_tasks and import_tasks."""
+    seen = set() if seen is None else seen
+    seen.add(name)
+    with open(os.path.join(tasks_dir, name)) as f:
+        tasks = yaml.safe_load(f) or []
+    while tasks:
+        task = tasks.pop()
+        for key in ('block', 'rescue', 'always'):
+            tasks.extend(task.get(key, []))
+        for key in ('include_tasks', 'import_tasks', 'ansible.builtin.include_tasks', 'ansible.builtin.import_tasks'):
+            included = task.get(key)
+            if isinstance(included, dict):
+                included = included.get('file')
+            if not included or '{{' in included:
+                continue
+            # Like Ansible, look next to the including file before the role's tasks directory
+            sibling = os.path.join(os.path.dirname(name), included)
+            included = sibling if os.path.exists(os.path.join(tasks_dir, sibling)) else included
+            if included not in seen:
+                included_task_files(tasks_dir, included, seen)
+    return seen
+
+def test_package_bundle_reachable_from_role():
+    """Test that the role installs packages through the bundle without the rest of prerequisites.yml"""
+    tasks_dir = os.path.join(os.path.dirname(__file__), '..', 'roles/rke2_cluster/tasks')
+    reachable = included_task_files(tasks_dir, 'main.yml')
+    assert {'prerequisite_packages.yml', 'package_bundle.yml'} <= reachable
+    # Firewall, sysctl and hardware checks are not part of a deploy
+    assert 'prerequisites.yml' not in reachable
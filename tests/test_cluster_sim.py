@@ -0,0 +1,275 @@
+import json
+import pytest
+from scripts.cluster_sim import (
+    ClusterState,
+    SimServer,
+    build_inventory,
+    describe_command,
+    internal_response,
+    inventory_hosts,
+    merge_profile,
+    parse_module_payload,
+    send_request,
+    summarize_timings,
+    unwrap_command,
+)
+
+# The parts of an AnsiballZ wrapper the simulator reads
+PAYLOAD = '''
+    def invoke_module(modlib_path, temp_path, json_params):
+        runpy.run_module(mod_name='ansible.modules.%s', init_globals=dict(_module_fqn='ansible.modules.%s'),
+    ANSIBALLZ_PARAMS = %r
+'''
+
+
+def payload(module, args):
+    return PAYLOAD % (module, module, json.dumps({'ANSIBLE_MODULE_ARGS': dict(args, _ansible_check_mode=False)}))
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cluster():
+    """Three control planes and one worker, time scale 1, no jitter"""
+    profile = merge_profile({'time_scale': 1.0})
+    for settings in profile['operations'].values():
+        settings['jitter'] = 0.0
+    clock = Clock()
+    state = ClusterState(profile, seed=1, clock=clock)
+    for name in ('cp1', 'cp2', 'cp3'):
+        state.add_node(name, control_plane=True)
+    state.add_node('worker1')
+    state.clock_ref = clock
+    return state
+
+
+def module(sim, host, module_name, /, **args):
+    return sim.handle(host, {'type': 'module', 'module': module_name, 'args': args})
+
+
+def shell(sim, host, script):
+    return module(sim, host, 'command', _raw_params=script, _uses_shell=True)['result']
+
+
+def deploy(sim, *names):
+    for name in names:
+        shell(sim, name, 'INSTALL_RKE2_TYPE=server bash /tmp/rke2-install.sh')
+        service = 'rke2-server' if sim.nodes[name]['control_plane'] else 'rke2-agent'
+        module(sim, name, 'systemd', name=service, state='started', enabled=True)
+
+
+def test_parse_module_payload():
+    """Test reading the module name and arguments from an AnsiballZ wrapper"""
+    name, args = parse_module_payload(payload('systemd_service', {'name': 'rke2-server', 'state': 'started'}))
+    assert name == 'systemd_service'
+    assert args == {'name': 'rke2-server', 'state': 'started'}
+    assert parse_module_payload('#!/bin/sh\necho hi') is None
+
+
+def test_unwrap_command():
+    """Test stripping the sh -c, become and sleep 0 wrappers"""
+    wrapped = ("/bin/sh -c 'sudo -H -S -n  -u root /bin/sh -c '\"'\"'echo BECOME-SUCCESS-abc ; "
+               "/usr/bin/python3'\"'\"' && sleep 0'")
+    assert unwrap_command(wrapped) == '/usr/bin/python3'
+    assert unwrap_command("/bin/sh -c 'systemctl status rke2-server && sleep 0'") == 'systemctl status rke2-server'
+
+
+def test_internal_response():
+    """Test that Ansible's tmpdir and cleanup commands are answered locally"""
+    cmd = ('/bin/sh -c \'( umask 77 && mkdir -p "` echo ~/.ansible/tmp `"&& mkdir "` echo '
+           '~/.ansible/tmp/ansible-tmp-1-2-3 `" && echo ansible-tmp-1-2-3="` echo ~/.ansible/tmp/ansible-tmp-1-2-3 `" )'
+           ' && sleep 0\'')
+    assert internal_response(cmd) == (0, 'ansible-tmp-1-2-3=/root/.ansible/tmp/ansible-tmp-1-2-3\n', '')
+    assert internal_response("/bin/sh -c 'rm -f -r /root/.ansible/tmp/x/ > /dev/null 2>&1 && sleep 0'")[0] == 0
+    assert internal_response("/bin/sh -c 'echo ~ && sleep 0'") == (0, '/root\n', '')
+    assert internal_response("/bin/sh -c 'kubectl get nodes && sleep 0'") is None
+
+
+def test_describe_command():
+    """Test piped modules, transferred modules with rendered files, and shell commands"""
+    piped = describe_command("/bin/sh -c '/usr/bin/python3 && sleep 0'", payload('stat', {'path': '/etc'}))
+    assert piped == {'type': 'module', 'module': 'stat', 'args': {'path': '/etc'}}
+
+    files = {
+        '/root/.ansible/tmp/t/AnsiballZ_copy.py': payload('copy', {'src': '/root/.ansible/tmp/t/source',
+                                                                    'dest': '/etc/rancher/rke2/config.yaml'}),
+        '/root/.ansible/tmp/t/source': 'token: abc\n',
+    }
+    transferred = describe_command("/bin/sh -c '/usr/bin/python3 /root/.ansible/tmp/t/AnsiballZ_copy.py && sleep 0'",
+                                   files=files)
+    assert transferred['module'] == 'copy'
+    assert transferred['content'] == 'token: abc\n'
+
+    assert describe_command("/bin/sh -c 'systemctl enable rke2-server && sleep 0'") == {
+        'type': 'command', 'cmd': 'systemctl enable rke2-server'}
+
+
+def test_service_start_registers_and_readies_node(cluster):
+    """Test that a node registers when its service is up and is Ready node_ready seconds later"""
+    assert module(cluster, 'cp1', 'systemd', name='rke2-server', state='started')['result']['failed']
+
+    shell(cluster, 'cp1', 'bash /tmp/rke2-install.sh')
+    response = module(cluster, 'cp1', 'systemd', name='rke2-server', state='started')
+    # systemctl start blocks until the unit is up
+    assert response['delay'] == pytest.approx(30.0 + 0.2)
+    assert module(cluster, 'cp1', 'stat', path='/var/lib/rancher/rke2/bin/kubectl')['result']['stat']['exists']
+
+    ready = "kubectl get nodes cp1 -o jsonpath='{.status.conditions[?(@.type==\"Ready\")].status}'"
+    assert shell(cluster, 'cp1', ready)['rc'] == 1  # apiserver not up yet
+    cluster.clock_ref.now = 30.0
+    assert shell(cluster, 'cp1', ready)['stdout'] == 'False'
+    cluster.clock_ref.now = 50.0
+    assert shell(cluster, 'cp1', ready)['stdout'] == 'True'
+    assert cluster.snapshot() == {'nodes': 4, 'registered': 1, 'ready': 1, 'etcd_members': 1}
+
+
+def test_wait_for_port_waits_for_server(cluster):
+    """Test that wait_for on the supervisor port lasts until the first server is up"""
+    deploy(cluster, 'cp1')
+    cluster.clock_ref.now = 10.0
+    response = module(cluster, 'cp2', 'wait_for', host='cp1', port=9345, timeout=600)
+    assert response['result']['elapsed'] == pytest.approx(20.0)
+    assert module(cluster, 'cp2', 'wait_for', port=9345, timeout=5)['result']['failed']
+    # wait_for with only a timeout just sleeps
+    assert module(cluster, 'cp2', 'wait_for', timeout=181)['delay'] == pytest.approx(181.2)
+
+
+def test_shell_pipelines_and_files(cluster):
+    """Test pipelines over kubectl output and files written by modules"""
+    deploy(cluster, 'cp1', 'cp2', 'cp3', 'worker1')
+    cluster.clock_ref.now = 100.0
+
+    module(cluster, 'cp1', 'template', src='/tmp/x/source', dest='/etc/rancher/rke2/config.yaml')
+    cluster.handle('cp1', {'type': 'module', 'module': 'copy', 'content': 'token: s3cret\nnode-name: cp1\n',
+                           'args': {'src': '/tmp/y/source', 'dest': '/etc/rancher/rke2/config.yaml'}})
+    assert shell(cluster, 'cp1', 'grep "token:" /etc/rancher/rke2/config.yaml | awk \'{print $2}\'')['stdout'] == 's3cret'
+
+    nodes = shell(cluster, 'cp1', "kubectl get nodes --selector='node-role.kubernetes.io/control-plane' "
+                                  "--no-headers | grep -v cp1 | grep Ready")
+    assert nodes['rc'] == 0
+    assert [line.split()[0] for line in nodes['stdout'].splitlines()] == ['cp2', 'cp3']
+
+    pending = shell(cluster, 'cp1', "kubectl get pods -n kube-system --field-selector spec.nodeName=worker1 "
+                                    "-o jsonpath='{.items[*].status.phase}' | tr ' ' '\\n' | grep -v Running")
+    assert pending['rc'] == 1 and pending['stdout'] == ''
+
+    token = shell(cluster, 'cp1', 'tr -dc A-Za-z0-9 </dev/urandom | head -c 64')
+    assert len(token['stdout']) == 64
+    assert shell(cluster, 'cp1', 'set -e\nfalse\necho not reached')['stdout'] == ''
+
+
+def test_etcd_member_removal_and_quorum(cluster):
+    """Test etcdctl member list/remove through kubectl exec and the endpoint health quorum"""
+    deploy(cluster, 'cp1', 'cp2', 'cp3')
+    cluster.clock_ref.now = 100.0
+    etcdctl = 'kubectl exec -n kube-system etcd-cp1 -- etcdctl --endpoints=https://127.0.0.1:2379 '
+
+    member_id = shell(cluster, 'cp1', etcdctl + "member list | grep cp3 | cut -d',' -f1")['stdout']
+    assert shell(cluster, 'cp1', etcdctl + 'member remove ' + member_id)['rc'] == 0
+    assert 'cp3' not in shell(cluster, 'cp1', etcdctl + 'member list')['stdout']
+    assert shell(cluster, 'cp1', etcdctl + 'endpoint health')['rc'] == 0
+
+    shell(cluster, 'cp2', 'systemctl stop rke2-server')
+    assert shell(cluster, 'cp1', etcdctl + 'endpoint health')['rc'] == 1
+
+
+def test_drain_and_uninstall(cluster):
+    """Test that complex scripts apply their main operation"""
+    deploy(cluster, 'cp1', 'worker1')
+    cluster.clock_ref.now = 100.0
+    drain = ('NODE="worker1"\nkubectl drain "$NODE" --ignore-daemonsets &\nDRAIN_PID=$!\n'
+             'while kill -0 $DRAIN_PID; do sleep 5; done\n')
+    assert shell(cluster, 'cp1', drain)['rc'] == 0
+    assert 'SchedulingDisabled' in shell(cluster, 'cp1', 'kubectl get nodes worker1')['stdout']
+
+    shell(cluster, 'worker1', 'if [ -f /usr/local/bin/rke2-uninstall.sh ]; then /usr/local/bin/rke2-uninstall.sh; fi')
+    assert not module(cluster, 'worker1', 'stat', path='/usr/local/bin/rke2')['result']['stat']['exists']
+    assert cluster.stats['uninstall']['count'] == 1
+    assert cluster.stats['drain']['count'] == 1
+
+
+def test_prerequisite_and_preflight_commands(cluster):
+    """Test the answers prerequisites.yml and etcd_preflight.yml rely on"""
+    assert '/usr/local/bin' in shell(cluster, 'cp1', 'sudo -n grep secure_path /etc/sudoers')['stdout']
+    installed = module(cluster, 'cp1', 'command', argv=['dpkg-query', '-W', '-f=${Package} ${Status}\n', 'curl', 'jq'])
+    assert installed['result']['stdout'].splitlines() == ['curl install ok installed', 'jq install ok installed']
+    assert shell(cluster, 'cp1', 'df -BG / --output=avail')['stdout'].splitlines()[1].strip() == '100G'
+
+    etcd = '/var/lib/rancher/rke2/server/db'
+    module(cluster, 'cp1', 'file', path=etcd, state='directory')
+    module(cluster, 'cp1', 'file', path=etcd + '/lost+found', state='directory')
+    assert module(cluster, 'cp1', 'find', paths=etcd, excludes='lost+found')['result']['matched'] == 0
+    module(cluster, 'cp1', 'file', path=etcd + '/etcd', state='directory')
+    assert module(cluster, 'cp1', 'find', paths=etcd, excludes='lost+found')['result']['matched'] == 1
+
+
+def test_failure_injection(cluster):
+    """Test that a failure rate of 1 fails every call of that kind without changing state"""
+    cluster.profile['operations']['install']['failure_rate'] = 1.0
+    result = shell(cluster, 'cp1', 'bash /tmp/rke2-install.sh')
+    assert result['failed'] and result['msg'] == 'simulated install failure'
+    assert '/usr/local/bin/rke2' not in cluster.nodes['cp1']['files']
+    assert cluster.stats['install'] == {'count': 1, 'failed': 1, 'seconds': 25.0, 'max_seconds': 25.0}
+
+
+def test_time_scale_and_jitter():
+    """Test that delays are scaled to wall time and jitter stays within bounds"""
+    state = ClusterState(merge_profile({'time_scale': 0.01}), seed=3)
+    state.add_node('cp1', control_plane=True)
+    delays = [state.handle('cp1', {'type': 'command', 'cmd': 'systemctl is-system-running'})['delay']
+              for _ in range(50)]
+    assert all(0.2 * 0.7 * 0.01 <= delay <= 0.2 * 1.3 * 0.01 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_fsync_bench_answer(cluster):
+    """Test that the etcd preflight script gets a fsync_bench.py verdict"""
+    cluster.profile['fsync_ms'] = 50.0
+    result = cluster.handle('cp1', {'type': 'command', 'cmd': '/usr/bin/python3 /root/.ansible/tmp/t/fsync_bench.py '
+                                                             '/var/lib/rancher/rke2/server/db --count 200'})
+    assert result['rc'] == 2
+    assert json.loads(result['stdout'])['passed'] is False
+
+
+def test_server_round_trip(cluster):
+    """Test the HTTP front end used by the connection plugin"""
+    server = SimServer(cluster).start()
+    try:
+        response = send_request(server.url, 'cp1', {'type': 'command', 'cmd': 'systemctl is-active rke2-server'})
+        assert response['rc'] == 3
+        assert response['stdout'] == 'inactive\n'
+    finally:
+        server.stop()
+
+
+def test_build_inventory():
+    """Test the simulated inventory layout and connection settings"""
+    inventory = build_inventory(5, control_planes=3)
+    hosts = list(inventory_hosts(inventory))
+    assert [host[0] for host in hosts] == ['sim-cp1', 'sim-cp2', 'sim-cp3', 'sim-worker1', 'sim-worker2']
+    assert [host[2] for host in hosts] == [True, True, True, False, False]
+    assert len({host[1] for host in hosts}) == 5
+    assert inventory['all']['vars']['ansible_connection'] == 'rke2_sim'
+    assert 'ansible_ssh_common_args' not in inventory['all']['vars']
+
+
+def test_summarize_timings():
+    """Test per-play and per-task-file totals from the timing callback"""
+    timings = {'seconds': 12.0, 'tasks': [
+        {'play': 'Deploy', 'name': 'Gathering Facts', 'path': 'rke2.yml:36', 'role': None, 'seconds': 1.0},
+        {'play': 'Deploy', 'name': 'Start', 'path': 'roles/rke2_cluster/tasks/install_rke2.yml:1',
+         'role': 'rke2_cluster', 'seconds': 6.0},
+        {'play': 'Deploy', 'name': 'Wait', 'path': 'roles/rke2_cluster/tasks/install_rke2.yml:20',
+         'role': 'rke2_cluster', 'seconds': 4.5},
+    ]}
+    summary = summarize_timings(timings)
+    assert summary['plays'] == {'Deploy': 11.5}
+    assert summary['phases'] == {'Deploy': {'seconds': 1.0, 'tasks': 1},
+                                 'install_rke2.yml': {'seconds': 10.5, 'tasks': 2}}
+    assert summary['slowest_tasks'][0]['name'] == 'Start'
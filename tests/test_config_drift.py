@@ -0,0 +1,93 @@
+import os
+import pytest
+from jinja2 import Environment
+from scripts.config_drift import (
+    config_digest,
+    compare_directories,
+    diff_configs,
+    normalize_config
+)
+
+DEPLOYED = """
+# Written by ansible
+write-kubeconfig-mode: "0644"
+cni: cilium
+tls-san:
+  - "127.0.0.1"
+  - "k1"
+  - "192.168.1.23"
+node-label:
+  - "workload.type=control-plane"
+token: abc
+"""
+
+def render(groups, hostname='k1'):
+    template_path = os.path.join(os.path.dirname(__file__), '../roles/rke2_cluster/templates/config.yaml.j2')
+    with open(template_path) as f:
+        template = Environment().from_string(f.read())
+    hostvars = {h: {'ansible_host': f'192.168.1.{20 + i}'} for i, h in enumerate(sorted(sum(groups.values(), [])))}
+    return template.render(
+        inventory_hostname=hostname,
+        groups=groups,
+        hostvars=hostvars,
+        rke2_config={'write_kubeconfig_mode': '0644'},
+        rke2_token='abc'
+    )
+
+def test_normalize_config_ignores_order():
+    """Test that key and list ordering do not matter"""
+    assert normalize_config({'b': [2, 1], 'a': 1}) == normalize_config({'a': 1, 'b': [1, 2]})
+
+def test_no_drift_for_comments_and_ordering():
+    """Test that comments, key order and list order are not drift"""
+    reordered = """
+token: abc
+node-label: ["workload.type=control-plane"]
+tls-san: ["192.168.1.23", "k1", "127.0.0.1"]
+cni: cilium
+write-kubeconfig-mode: '0644'
+"""
+    assert diff_configs(DEPLOYED, reordered) == []
+    assert config_digest(DEPLOYED) == config_digest(reordered)
+
+def test_drift_detected():
+    """Test added, removed and changed settings"""
+    desired = DEPLOYED.replace('cni: cilium', 'cni: canal').replace('token: abc', 'token: abc\nembedded-registry: true')
+    desired = desired.replace('  - "k1"\n', '  - "k9"\n')
+    changes = diff_configs(DEPLOYED, desired)
+
+    assert {'path': 'cni', 'change': 'changed', 'deployed': 'cilium', 'desired': 'canal'} in changes
+    assert {'path': 'embedded-registry', 'change': 'added', 'deployed': None, 'desired': True} in changes
+    assert {'path': 'tls-san', 'change': 'removed', 'deployed': 'k1', 'desired': None} in changes
+    assert {'path': 'tls-san', 'change': 'added', 'deployed': None, 'desired': 'k9'} in changes
+    assert config_digest(DEPLOYED) != config_digest(desired)
+
+def test_missing_deployed_config():
+    """Test that an empty deployed config reports every setting as added"""
+    changes = diff_configs('', DEPLOYED)
+    assert {c['change'] for c in changes} == {'added'}
+    assert len(changes) == 5
+
+def test_rendered_template_stable_under_group_reordering():
+    """Test that reordering hosts in groups does not cause drift"""
+    groups = {'control_plane_nodes': ['k1', 'k2', 'k3'], 'worker_nodes': ['w1', 'w2']}
+    reordered = {'control_plane_nodes': ['k1', 'k3', 'k2'], 'worker_nodes': ['w2', 'w1']}
+    assert render(groups) != render(reordered)
+    assert diff_configs(render(groups), render(reordered)) == []
+
+    changes = diff_configs(render(groups), render({'control_plane_nodes': ['k1', 'k2', 'k3'], 'worker_nodes': ['w1']}))
+    assert changes and all(c['change'] == 'removed' for c in changes)
+
+def test_compare_directories(tmp_path):
+    """Test per-host reports for directories of configs"""
+    deployed = tmp_path / "deployed"
+    desired = tmp_path / "desired"
+    deployed.mkdir()
+    desired.mkdir()
+    (deployed / "k1_config.yaml").write_text(DEPLOYED)
+    (desired / "k1_config.yaml").write_text(DEPLOYED + "\n# trailing comment\n")
+    (desired / "k2_config.yaml").write_text(DEPLOYED)
+
+    report = compare_directories(str(deployed), str(desired))
+    assert report['k1'] == {'missing': False, 'changes': []}
+    assert report['k2']['missing'] is True
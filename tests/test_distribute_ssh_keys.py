@@ -0,0 +1,125 @@
+import json
+import threading
+import pytest
+from scripts.distribute_ssh_keys import (
+    build_check_command,
+    build_push_command,
+    distribute_keys,
+    load_hosts,
+    write_summary
+)
+
+PUBLIC_KEY = "ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAItest user@host"
+
+class FakeTransport:
+    """In-memory transport that emulates ssh/sshpass for a set of hosts."""
+
+    def __init__(self, authorized=(), password='secret', unreachable=()):
+        self.authorized = set(authorized)
+        self.password = password
+        self.unreachable = set(unreachable)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def run(self, args, input_data=None, env=None, timeout=None):
+        address = args[-2].split('@', 1)[1]
+        with self.lock:
+            self.calls.append((args[0], address))
+        if address in self.unreachable:
+            return 255, '', 'ssh: connect to host: Connection timed out'
+        if args[0] == 'ssh':
+            if address in self.authorized:
+                return 0, 'success\n', ''
+            return 255, '', 'Permission denied (publickey)'
+        if args[0] == 'sshpass':
+            if env.get('SSHPASS') != self.password:
+                return 5, '', 'Permission denied, please try again.'
+            assert input_data.strip() == PUBLIC_KEY
+            with self.lock:
+                self.authorized.add(address)
+            return 0, '', ''
+        return 127, '', 'unknown command'
+
+@pytest.fixture
+def sample_hosts():
+    return [
+        {'name': 'k1', 'address': '192.168.1.23', 'user': 'ubuntu', 'port': None},
+        {'name': 'k2', 'address': '192.168.1.24', 'user': 'ubuntu', 'port': None},
+        {'name': 'node7', 'address': '192.168.1.55', 'user': 'ubuntu', 'port': None}
+    ]
+
+def test_build_commands(sample_hosts):
+    """Test ssh command construction"""
+    check = build_check_command(sample_hosts[0])
+    assert check[0] == 'ssh'
+    assert 'BatchMode=yes' in check
+    assert check[-2] == 'ubuntu@192.168.1.23'
+
+    push = build_push_command(dict(sample_hosts[0], port=2222))
+    assert push[:2] == ['sshpass', '-e']
+    assert '2222' in push
+    assert 'authorized_keys' in push[-1]
+
+def test_distribute_keys_pushes_only_where_needed(sample_hosts):
+    """Test that keys are only pushed to hosts without key auth"""
+    transport = FakeTransport(authorized={'192.168.1.23'})
+    summary = distribute_keys(sample_hosts, PUBLIC_KEY, password='secret', transport=transport)
+
+    statuses = {r['host']: r['status'] for r in summary['hosts']}
+    assert statuses == {'k1': 'present', 'k2': 'pushed', 'node7': 'pushed'}
+    assert summary['counts'] == {'present': 1, 'pushed': 2, 'failed': 0}
+    assert ('sshpass', '192.168.1.23') not in transport.calls
+
+def test_distribute_keys_failures(sample_hosts):
+    """Test failure reporting for bad passwords, unreachable hosts and no password"""
+    transport = FakeTransport(unreachable={'192.168.1.55'})
+    summary = distribute_keys(sample_hosts, PUBLIC_KEY, password='wrong', transport=transport)
+    assert summary['counts']['failed'] == 3
+    assert all('error' in r for r in summary['hosts'])
+
+    summary = distribute_keys(sample_hosts, PUBLIC_KEY, password=None, transport=FakeTransport())
+    assert summary['counts']['failed'] == 3
+    assert 'no password' in summary['hosts'][0]['error']
+
+def test_distribute_keys_many_hosts():
+    """Test that a large host list completes with bounded workers"""
+    hosts = [
+        {'name': f'node{i}', 'address': f'10.0.{i // 250}.{i % 250 + 1}', 'user': 'ubuntu', 'port': None}
+        for i in range(500)
+    ]
+    transport = FakeTransport(authorized={h['address'] for h in hosts[::2]})
+    summary = distribute_keys(hosts, PUBLIC_KEY, password='secret', transport=transport, max_workers=8)
+    assert summary['counts'] == {'present': 250, 'pushed': 250, 'failed': 0}
+
+def test_load_hosts(tmp_path):
+    """Test reading hosts from a generated inventory"""
+    inventory_file = tmp_path / "rke2.yml"
+    inventory_file.write_text("""
+all:
+  vars:
+    ansible_user: admin
+  children:
+    six_node_cluster:
+      children:
+        control_plane_nodes:
+          hosts:
+            k1:
+              ansible_host: 192.168.1.23
+        worker_nodes:
+          hosts:
+            node7:
+              ansible_host: 192.168.1.55
+              ansible_user: ubuntu
+""")
+    hosts = {h['name']: h for h in load_hosts(str(inventory_file))}
+    assert hosts['k1']['address'] == '192.168.1.23'
+    assert hosts['k1']['user'] == 'admin'
+    assert hosts['node7']['user'] == 'ubuntu'
+
+def test_write_summary(tmp_path, sample_hosts):
+    """Test JSON summary output"""
+    summary = distribute_keys(sample_hosts, PUBLIC_KEY, password='secret', transport=FakeTransport())
+    output = tmp_path / "out" / "summary.json"
+    write_summary(summary, str(output))
+    with open(output) as f:
+        assert json.load(f)['total'] == 3
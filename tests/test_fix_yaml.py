@@ -2,6 +2,8 @@ import pytest
 from scripts.fix_yaml import (
     fix_yaml_file,
     validate_yaml_structure,
+    validate_inventory_node,
+    load_yaml,
     backup_file
 )
 import os
@@ -92,3 +94,127 @@ def test_fix_yaml_file_with_invalid_file():
             fix_yaml_file(temp_path)
     finally:
         os.unlink(temp_path)
+
+
+def test_backup_file_preserves_content(tmp_path):
+    """Test that backups are byte-for-byte copies"""
+    test_file = tmp_path / "large.yml"
+    content = b"all:\n  children: {}\n" * 50000
+    test_file.write_bytes(content)
+
+    backup_path = backup_file(str(test_file))
+    with open(backup_path, 'rb') as f:
+        assert f.read() == content
+
+def test_load_yaml_returns_data_and_node(sample_yaml_file):
+    """Test that a single parse yields both data and the node tree"""
+    with open(sample_yaml_file, 'rb') as f:
+        data, node = load_yaml(f)
+    assert data['all']['children']['six_node_cluster']['children']['control_plane_nodes']['hosts']['k1']['ansible_host'] == '192.168.1.23'
+    assert validate_inventory_node(node) == True
+
+@pytest.mark.parametrize("content,message,line", [
+    ("""all:
+  children:
+    six_node_cluster:
+      children:
+        worker_nodes:
+          hosts:
+            node7:
+              ansible_host: 192.168.1.300
+""", "Invalid IP address for host 'node7'", 8),
+    ("""all:
+  children:
+    six_node_cluster:
+      hostz: {}
+""", "Unknown key 'hostz' in group 'six_node_cluster'", 4),
+    ("""all:
+  children:
+    worker_nodes:
+      hosts:
+        node7:
+          ansible_host: node_7.example.com
+""", "Invalid host name for host 'node7'", 6),
+    ("""all:
+  children:
+    worker_nodes:
+      hosts:
+        l4:
+          ansible_host: 192.168.1.4
+          mounts:
+            agent:
+              enabled: 'yes'
+              device: /dev/sda1
+""", "'enabled' must be a boolean", 9),
+    ("""all:
+  children:
+    worker_nodes:
+      hosts:
+        l4:
+          mounts:
+            agent:
+              enabled: true
+              device: sda1
+""", "needs a device under /dev/", 9),
+    ("""all:
+  vars:
+    - ansible_user
+  children: {}
+""", "vars in group 'all' must be a mapping", 3),
+])
+def test_fix_yaml_file_schema_errors(tmp_path, content, message, line):
+    """Test schema validation errors report the offending line"""
+    file_path = tmp_path / "inventory.yml"
+    file_path.write_text(content)
+    with pytest.raises(ValueError) as exc_info:
+        fix_yaml_file(str(file_path))
+    assert message in str(exc_info.value)
+    assert str(exc_info.value).startswith(f"Line {line}:")
+
+def test_ansible_host_accepts_host_names(tmp_path):
+    """Test that DNS names and IPv6 addresses are valid ansible_host values"""
+    file_path = tmp_path / "inventory.yml"
+    file_path.write_text("""all:
+  children:
+    worker_nodes:
+      hosts:
+        node7:
+          ansible_host: node7.example.com
+        node8:
+          ansible_host: fd00::8
+""")
+    assert fix_yaml_file(str(file_path))
+
+def test_merge_keys_are_resolved():
+    """Test that '<<' merge keys are validated as the keys they merge in"""
+    node = yaml.compose("""all:
+  children:
+    worker_nodes:
+      <<: {vars: {ansible_user: ubuntu}}
+      hosts:
+        node7: {ansible_host: 10.0.0.7}
+""")
+    assert validate_inventory_node(node) == True
+    with pytest.raises(ValueError, match="Unknown key 'hostz' in group 'worker_nodes'"):
+        validate_inventory_node(yaml.compose("""all:
+  children:
+    worker_nodes:
+      <<: {hostz: {}}
+"""))
+
+def test_fix_yaml_file_large_inventory(tmp_path):
+    """Test validation of a large generated inventory"""
+    hosts = {
+        f"node{i}": {
+            'ansible_host': f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}",
+            'mounts': {'agent': {'enabled': True, 'device': '/dev/sdb1', 'fstype': 'xfs', 'opts': 'defaults'}}
+        }
+        for i in range(5000)
+    }
+    inventory = {'all': {'vars': {'ansible_user': 'ubuntu'}, 'children': {'worker_nodes': {'hosts': hosts}}}}
+    file_path = tmp_path / "large.yml"
+    with open(file_path, 'w') as f:
+        yaml.dump(inventory, f, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper))
+
+    data = fix_yaml_file(str(file_path))
+    assert len(data['all']['children']['worker_nodes']['hosts']) == 5000
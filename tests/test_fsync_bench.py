@@ -0,0 +1,59 @@
+import json
+import os
+import pytest
+from scripts.fsync_bench import evaluate, main, percentile, run_benchmark, summarize
+
+def test_percentile():
+    """Test nearest-rank percentiles"""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([7], 99) == 7
+    assert percentile([], 99) == 0.0
+
+def test_summarize_and_evaluate():
+    """Test that one slow sync in a hundred decides the p99 verdict"""
+    latencies = [0.001] * 98 + [0.05, 0.05]
+    result = summarize(latencies)
+    assert result['count'] == 100
+    assert result['p50_ms'] == 1.0
+    assert result['p99_ms'] == 50.0
+    assert result['max_ms'] == 50.0
+
+    assert not evaluate(result, '/var/lib/rancher/rke2/server/db')['passed']
+    assert evaluate(result, '/tmp', threshold_ms=100)['passed']
+    assert evaluate(summarize([0.001] * 100), '/tmp')['passed']
+
+def test_run_benchmark_writes_and_cleans_up(tmp_path):
+    """Test that every block is synced and the scratch file is removed"""
+    synced = []
+
+    def fake_sync(fd):
+        synced.append(os.fstat(fd).st_size)
+
+    ticks = iter(range(1000))
+    result = run_benchmark(str(tmp_path), block_size=100, count=5, sync=fake_sync,
+                           clock=lambda: next(ticks) * 0.002)
+    assert synced == [100, 200, 300, 400, 500]
+    assert result['count'] == 5
+    assert result['p99_ms'] == 2.0
+    assert os.listdir(tmp_path) == []
+
+def test_main_reports_json(tmp_path, capsys):
+    """Test CLI output and exit codes"""
+    assert main([str(tmp_path / 'db'), '--count', '5', '--threshold-ms', '10000']) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result['passed'] is True
+    assert result['count'] == 5
+    assert result['directory'] == str(tmp_path / 'db')
+
+    assert main([str(tmp_path / 'db'), '--count', '5', '--threshold-ms', '0']) == 2
+    assert json.loads(capsys.readouterr().out)['passed'] is False
+
+def test_main_error(tmp_path, capsys):
+    """Test that an unusable directory is reported as an error"""
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    assert main([str(blocker / 'db'), '--count', '1']) == 1
+    assert 'error' in json.loads(capsys.readouterr().out)
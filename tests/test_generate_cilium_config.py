@@ -0,0 +1,145 @@
+import pytest
+import yaml
+from scripts.generate_cilium_config import (
+    MAGLEV_TABLE_SIZES,
+    build_cilium_values,
+    main,
+    maglev_table_size,
+    parse_kernel_version,
+    render_manifest,
+    unsupported_features
+)
+
+ALL_FEATURES = {
+    'cilium_routing_mode': 'native',
+    'cilium_bpf_masquerade': 'true',
+    'cilium_bbr': 'true',
+    'cilium_xdp_acceleration': 'true',
+    'cilium_maglev': 'true',
+}
+
+def parse_values(manifest):
+    """Return the chart values embedded in a HelmChartConfig manifest."""
+    document = yaml.safe_load(manifest)
+    assert document['kind'] == 'HelmChartConfig'
+    assert document['metadata'] == {'name': 'rke2-cilium', 'namespace': 'kube-system'}
+    return yaml.safe_load(document['spec']['valuesContent'])
+
+def test_defaults_match_previous_config():
+    """Test that without cilium_* vars only the previous static values are rendered"""
+    values = parse_values(render_manifest(build_cilium_values({}, 6, ['5.15.0-91-generic'])))
+    assert values == {
+        'kubeProxyReplacement': True,
+        'k8sServiceHost': '127.0.0.1',
+        'k8sServicePort': '6443',
+        'cni': {'chainingMode': 'none'},
+        'routingMode': 'tunnel',
+        'tunnelProtocol': 'vxlan',
+    }
+
+def test_all_features_on_recent_kernel():
+    """Test native routing with every datapath feature on a 6.x kernel"""
+    values = parse_values(render_manifest(build_cilium_values(ALL_FEATURES, 6, ['6.8.0-45-generic'])))
+    assert values['routingMode'] == 'native'
+    assert values['ipv4NativeRoutingCIDR'] == '10.42.0.0/16'
+    assert values['autoDirectNodeRoutes'] is True
+    assert 'tunnelProtocol' not in values
+    assert values['bpf'] == {'masquerade': True}
+    assert values['bandwidthManager'] == {'enabled': True, 'bbr': True}
+    assert values['loadBalancer'] == {'acceleration': 'native', 'algorithm': 'maglev'}
+    assert values['maglev']['tableSize'] == 1021
+
+def test_prometheus_metrics():
+    """Test that cilium_prometheus opens the agent and operator metrics ports"""
+    values = build_cilium_values({'cilium_prometheus': 'true'}, 6, ['4.18.0-553.el8'])
+    assert values['prometheus'] == {'enabled': True}
+    assert values['operator'] == {'prometheus': {'enabled': True}}
+    assert 'prometheus' not in build_cilium_values({'cilium_prometheus': 'false'}, 6)
+
+def test_kernel_gating_uses_oldest_node():
+    """Test that BBR is dropped when any node runs a kernel older than 5.18"""
+    kernels = ['6.8.0-45-generic', '5.15.0-91-generic']
+    assert unsupported_features(ALL_FEATURES, kernels) == [('cilium_bbr', '5.18')]
+
+    values = build_cilium_values(ALL_FEATURES, 6, kernels)
+    assert values['bandwidthManager'] == {'enabled': True, 'bbr': False}
+    assert values['bpf'] == {'masquerade': True}
+
+    values = build_cilium_values(ALL_FEATURES, 6, ['4.18.0-553.el8'])
+    assert 'bandwidthManager' not in values
+    assert 'bpf' not in values
+    assert 'loadBalancer' not in values
+    assert values['routingMode'] == 'native'
+
+    # No kernel facts: nothing is gated
+    assert unsupported_features(ALL_FEATURES, []) == []
+
+@pytest.mark.parametrize("node_count,expected", [
+    (1, 251),
+    (2, 251),
+    (3, 509),
+    (6, 1021),
+    (100, 16381),
+    (5000, 131071),
+])
+def test_maglev_table_size(node_count, expected):
+    """Test that the Maglev table holds at least 100 entries per node"""
+    size = maglev_table_size(node_count)
+    assert size == expected
+    assert size in MAGLEV_TABLE_SIZES
+
+def test_maglev_overrides():
+    """Test explicit Maglev table size and hash seed"""
+    values = build_cilium_values(dict(ALL_FEATURES, cilium_maglev_table_size='65521',
+                                      cilium_maglev_hash_seed='seed123'), 6)
+    assert values['maglev'] == {'tableSize': 65521, 'hashSeed': 'seed123'}
+
+def test_tunnel_protocol():
+    """Test geneve tunnelling"""
+    values = build_cilium_values({'cilium_tunnel_protocol': 'geneve'})
+    assert values['routingMode'] == 'tunnel'
+    assert values['tunnelProtocol'] == 'geneve'
+
+@pytest.mark.parametrize("bad_vars", [
+    {'cilium_routing_mode': 'direct'},
+    {'cilium_tunnel_protocol': 'ipip'},
+    {'cilium_native_routing_cidr': '10.42.0.0/33'},
+    {'cilium_maglev_table_size': '1000'},
+])
+def test_invalid_settings(bad_vars):
+    """Test that invalid cilium_* vars are rejected"""
+    with pytest.raises(ValueError):
+        build_cilium_values(bad_vars)
+
+def test_parse_kernel_version():
+    """Test kernel release parsing"""
+    assert parse_kernel_version('5.15.0-91-generic') == (5, 15)
+    assert parse_kernel_version('6.1.0-rpi7-rpi-v8') == (6, 1)
+    assert parse_kernel_version('') is None
+
+def test_main_reads_inventory_vars(tmp_path, capsys):
+    """Test the CLI against a generated inventory"""
+    inventory_file = tmp_path / "rke2.yml"
+    inventory_file.write_text("""
+all:
+  vars:
+    cilium_routing_mode: native
+    cilium_bbr: 'true'
+  children:
+    six_node_cluster:
+      children:
+        control_plane_nodes:
+          hosts:
+            k1: {ansible_host: 192.168.1.23}
+            k2: {ansible_host: 192.168.1.24}
+            k3: {ansible_host: 192.168.1.25}
+        worker_nodes:
+          hosts:
+            w1: {ansible_host: 192.168.1.26}
+""")
+    output = tmp_path / "cilium.yaml"
+    assert main(['-i', str(inventory_file), '--kernel', '5.15.0-91-generic', '-o', str(output)]) == 0
+    assert 'cilium_bbr disabled' in capsys.readouterr().err
+    values = parse_values(output.read_text())
+    assert values['routingMode'] == 'native'
+    assert values['bandwidthManager'] == {'enabled': True, 'bbr': False}
@@ -1,6 +1,10 @@
 import pytest
 from scripts.generate_inventory import (
+    generate_inventory,
+    generate_inventory_from_lines,
     generate_inventory_structure,
+    generate_node_vars,
+    parse_host_line,
     validate_node_data,
     write_inventory_file
 )
@@ -75,3 +79,41 @@ def test_write_inventory_file(tmp_path):
     with open(file_path) as f:
         loaded_data = yaml.safe_load(f)
         assert loaded_data == inventory_data
+
+
+def test_generate_inventory_from_lines(tmp_path):
+    """Test that file and line based parsing produce the same inventory"""
+    lines = [
+        "[vars]",
+        "rke2_version=v1.31.4+rke2r1",
+        "[six_node]",
+        "k1 192.168.1.23",
+        "l4 192.168.1.4 agent_mount_device=/dev/sda1",
+        "[control_plane_nodes]",
+        "k1",
+        "[worker_nodes]",
+        "l4",
+    ]
+    hosts_file = tmp_path / "hosts.txt"
+    hosts_file.write_text("\n".join(lines) + "\n")
+
+    inventory = generate_inventory_from_lines(lines)
+    assert inventory == generate_inventory(str(hosts_file))
+    workers = inventory['all']['children']['six_node_cluster']['children']['worker_nodes']['hosts']
+    assert workers['l4']['mounts']['agent']['device'] == '/dev/sda1'
+
+def test_parse_host_line_mount_devices():
+    """Test agent and etcd mount devices on the same host"""
+    hostname, host_vars = parse_host_line("k1 192.168.1.23 etcd_mount_device=/dev/nvme1n1 agent_mount_device=/dev/sdb")
+    assert hostname == 'k1'
+    assert host_vars['ansible_host'] == '192.168.1.23'
+    assert host_vars['mounts']['etcd'] == {
+        'enabled': True,
+        'device': '/dev/nvme1n1',
+        'fstype': 'xfs',
+        'opts': 'defaults,noatime'
+    }
+    assert host_vars['mounts']['agent']['opts'] == 'defaults,pquota,prjquota'
+
+    node_vars = generate_node_vars({'etcd_mount_device': '/dev/nvme1n1'})
+    assert node_vars['mounts'] == {'etcd': host_vars['mounts']['etcd']}
@@ -0,0 +1,109 @@
+import json
+import pytest
+from scripts.inventory_index import InventoryIndex, main
+from scripts.generate_rke2_configs import check_duplicate_ips
+
+@pytest.fixture
+def sample_inventory():
+    return {
+        'all': {
+            'vars': {'ansible_user': 'ubuntu', 'rke2_version': 'v1.31.4+rke2r1'},
+            'children': {
+                'six_node_cluster': {
+                    'children': {
+                        'control_plane_nodes': {
+                            'hosts': {
+                                'k1': {'ansible_host': '192.168.1.23'},
+                                'k2': {'ansible_host': '192.168.1.24'}
+                            }
+                        },
+                        'worker_nodes': {
+                            'hosts': {
+                                'l4': {
+                                    'ansible_host': '192.168.1.4',
+                                    'mounts': {'agent': {'enabled': True, 'device': '/dev/sda1'}}
+                                },
+                                'l5': {
+                                    'ansible_host': '192.168.1.20',
+                                    'mounts': {'agent': {'enabled': True, 'device': '/dev/sda1'}}
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+def test_host_and_ip_lookups(sample_inventory):
+    """Test lookups by host name and IP"""
+    index = InventoryIndex(sample_inventory)
+    assert index.host('k1') == {'ansible_host': '192.168.1.23'}
+    assert index.host('missing') is None
+    assert index.hosts_by_ip('192.168.1.4') == ['l4']
+    assert index.hostvars('k2')['rke2_version'] == 'v1.31.4+rke2r1'
+
+def test_hostvars_merge_every_group(sample_inventory):
+    """Test that hostvars applies the vars of every group, children over parents"""
+    cluster = sample_inventory['all']['children']['six_node_cluster']
+    cluster['vars'] = {'rke2_version': 'v1.32.1+rke2r1', 'cni': 'cilium'}
+    cluster['children']['control_plane_nodes']['vars'] = {'cni': 'canal', 'node_role': 'server'}
+    cluster['children']['control_plane_nodes']['hosts']['k2']['node_role'] = 'etcd'
+    index = InventoryIndex(sample_inventory)
+    assert index.hostvars('k1') == {
+        'ansible_user': 'ubuntu',
+        'rke2_version': 'v1.32.1+rke2r1',
+        'cni': 'canal',
+        'node_role': 'server',
+        'ansible_host': '192.168.1.23',
+    }
+    assert index.hostvars('k2')['node_role'] == 'etcd'
+    assert index.hostvars('l4')['cni'] == 'cilium'
+    assert 'node_role' not in index.hostvars('l4')
+
+def test_group_lookups(sample_inventory):
+    """Test recursive group membership"""
+    index = InventoryIndex(sample_inventory)
+    assert index.group('control_plane_nodes') == ['k1', 'k2']
+    assert index.group('six_node_cluster') == ['k1', 'k2', 'l4', 'l5']
+    assert index.group('all') == ['k1', 'k2', 'l4', 'l5']
+    assert index.groups_of('l4') == ['worker_nodes', 'six_node_cluster', 'all']
+    assert index.children['six_node_cluster'] == ['control_plane_nodes', 'worker_nodes']
+
+def test_device_lookup(sample_inventory):
+    """Test lookups by mount device"""
+    index = InventoryIndex(sample_inventory)
+    assert index.hosts_by_device('/dev/sda1') == [('l4', 'agent'), ('l5', 'agent')]
+    assert index.hosts_by_device('/dev/nvme0n1') == []
+
+def test_duplicate_ips(sample_inventory):
+    """Test duplicate IP detection"""
+    assert InventoryIndex(sample_inventory).duplicate_ips() == {}
+    assert check_duplicate_ips(sample_inventory) == True
+
+    workers = sample_inventory['all']['children']['six_node_cluster']['children']['worker_nodes']['hosts']
+    workers['l5']['ansible_host'] = '192.168.1.23'
+    assert InventoryIndex(sample_inventory).duplicate_ips() == {'192.168.1.23': ['k1', 'l5']}
+    with pytest.raises(ValueError, match="Duplicate IP addresses"):
+        check_duplicate_ips(sample_inventory)
+
+def test_empty_inventory():
+    """Test indexing an empty inventory"""
+    index = InventoryIndex({})
+    assert index.hosts == {}
+    assert index.group('all') == []
+
+def test_cli_queries(tmp_path, sample_inventory, capsys):
+    """Test the command line interface"""
+    import yaml
+    inventory_file = tmp_path / "rke2.yml"
+    inventory_file.write_text(yaml.dump(sample_inventory))
+
+    assert main(['-i', str(inventory_file), 'ip', '192.168.1.24']) == 0
+    assert json.loads(capsys.readouterr().out) == ['k2']
+
+    assert main(['-i', str(inventory_file), 'device', '/dev/sda1']) == 0
+    assert json.loads(capsys.readouterr().out)[0] == {'host': 'l4', 'mount': 'agent'}
+
+    assert main(['-i', str(inventory_file), 'host', 'nope']) == 1
+    assert main(['-i', str(inventory_file), 'duplicates']) == 0
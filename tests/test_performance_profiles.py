@@ -0,0 +1,102 @@
+import os
+import pytest
+import yaml
+from jinja2 import Environment
+
+ROLE_DIR = os.path.join(os.path.dirname(__file__), '../roles/rke2_cluster')
+
+@pytest.fixture
+def role_defaults():
+    with open(os.path.join(ROLE_DIR, 'defaults/main.yml')) as f:
+        return yaml.safe_load(f)
+
+def render(role_defaults, hostname, **extra_vars):
+    """Render config.yaml.j2 with the role defaults and return the parsed YAML."""
+    with open(os.path.join(ROLE_DIR, 'templates/config.yaml.j2')) as f:
+        template = Environment().from_string(f.read())
+    template_vars = {
+        'inventory_hostname': hostname,
+        'groups': {'control_plane_nodes': ['k1', 'k2', 'k3'], 'worker_nodes': ['w1']},
+        'hostvars': {
+            'k1': {'ansible_host': '192.168.1.23'},
+            'k2': {'ansible_host': '192.168.1.24'},
+            'k3': {'ansible_host': '192.168.1.25'},
+            'w1': {'ansible_host': '192.168.1.26'}
+        },
+        'rke2_config': {'write_kubeconfig_mode': '0644'},
+        'rke2_token': 'test123',
+        'rke2_performance_profiles': role_defaults['rke2_performance_profiles'],
+        'rke2_performance_profile_thresholds': role_defaults['rke2_performance_profile_thresholds'],
+    }
+    template_vars.update(extra_vars)
+    return yaml.safe_load(template.render(**template_vars))
+
+def args_dict(args):
+    return dict(arg.split('=', 1) for arg in args)
+
+def test_default_profile_renders_no_tuning(role_defaults):
+    """Test that the default 'none' profile leaves the config untouched"""
+    assert role_defaults['rke2_performance_profile'] == 'none'
+    config = render(role_defaults, 'k1', rke2_performance_profile='none')
+    assert 'etcd-arg' not in config
+    assert 'kubelet-arg' not in config
+
+    config = render(role_defaults, 'k1', rke2_performance_profiles=None)
+    assert 'etcd-arg' not in config
+
+@pytest.mark.parametrize("profile", ['small', 'medium', 'large'])
+def test_profile_control_plane(role_defaults, profile):
+    """Test that each profile renders etcd, apiserver and kubelet args on control planes"""
+    expected = role_defaults['rke2_performance_profiles'][profile]
+    config = render(role_defaults, 'k2', rke2_performance_profile=profile)
+
+    etcd = args_dict(config['etcd-arg'])
+    assert etcd == {k: str(v) for k, v in expected['etcd'].items()}
+    assert int(etcd['election-timeout']) >= 5 * int(etcd['heartbeat-interval'])
+    assert int(etcd['quota-backend-bytes']) <= 8 * 1024 ** 3
+
+    apiserver = args_dict(config['kube-apiserver-arg'])
+    assert int(apiserver['max-mutating-requests-inflight']) < int(apiserver['max-requests-inflight'])
+
+    kubelet = args_dict(config['kubelet-arg'])
+    assert int(kubelet['max-pods']) <= 254
+    assert kubelet['kube-reserved'] == expected['kubelet']['kube-reserved']
+
+@pytest.mark.parametrize("profile", ['small', 'medium', 'large'])
+def test_profile_worker(role_defaults, profile):
+    """Test that workers only get kubelet args"""
+    config = render(role_defaults, 'w1', rke2_performance_profile=profile)
+    assert 'etcd-arg' not in config
+    assert 'kube-apiserver-arg' not in config
+    assert args_dict(config['kubelet-arg'])['max-pods'] == str(role_defaults['rke2_performance_profiles'][profile]['kubelet']['max-pods'])
+
+def test_profiles_scale_up(role_defaults):
+    """Test that larger profiles never lower limits"""
+    profiles = role_defaults['rke2_performance_profiles']
+    for smaller, larger in (('small', 'medium'), ('medium', 'large')):
+        assert profiles[smaller]['etcd']['quota-backend-bytes'] <= profiles[larger]['etcd']['quota-backend-bytes']
+        assert profiles[smaller]['kube_apiserver']['max-requests-inflight'] <= profiles[larger]['kube_apiserver']['max-requests-inflight']
+        assert profiles[smaller]['kubelet']['max-pods'] <= profiles[larger]['kubelet']['max-pods']
+
+@pytest.mark.parametrize("vcpus,memory_mb,expected", [
+    (2, 4096, 'small'),
+    (32, 8192, 'small'),
+    (8, 16384, 'medium'),
+    (16, 65536, 'medium'),
+    (32, 131072, 'large'),
+])
+def test_auto_profile_from_facts(role_defaults, vcpus, memory_mb, expected):
+    """Test that auto picks a profile from CPU and memory facts"""
+    config = render(
+        role_defaults, 'k1',
+        rke2_performance_profile='auto',
+        ansible_processor_vcpus=vcpus,
+        ansible_memtotal_mb=memory_mb
+    )
+    expected_etcd = role_defaults['rke2_performance_profiles'][expected]['etcd']
+    assert args_dict(config['etcd-arg'])['quota-backend-bytes'] == str(expected_etcd['quota-backend-bytes'])
+
+def test_auto_profile_without_facts(role_defaults):
+    """Test that auto without gathered facts applies no tuning"""
+    config = render(role_defaults, 'k1', rke2_performance_profile='auto')
+    assert 'etcd-arg' not in config
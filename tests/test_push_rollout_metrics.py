@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import yaml
+from jinja2 import Environment
+from scripts.push_rollout_metrics import format_metrics, main, push, push_url
+
+REPO_DIR = os.path.join(os.path.dirname(__file__), '..')
+ROLE_DIR = os.path.join(REPO_DIR, 'roles/rke2_cluster')
+
+@pytest.fixture
+def pushgateway():
+    """Minimal Pushgateway that records every PUT as (path, body)."""
+    pushed = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_PUT(self):
+            pushed.append((self.path, self.rfile.read(int(self.headers['Content-Length'])).decode()))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", pushed
+    server.shutdown()
+    server.server_close()
+
+def samples(text):
+    """Return {metric: value} for the sample lines of an exposition."""
+    return {
+        line.split()[0]: float(line.split()[1])
+        for line in text.splitlines() if line and not line.startswith('#')
+    }
+
+def test_format_metrics():
+    """Test that the exposition has the duration, end time and outcome, and ends with a newline"""
+    text = format_metrics(184.25, finished=1700000000)
+    assert text.endswith('\n')
+    assert samples(text) == {
+        'rke2_rollout_phase_duration_seconds': 184.25,
+        'rke2_rollout_phase_completed_timestamp_seconds': 1700000000.0,
+        'rke2_rollout_phase_success': 1.0,
+    }
+    assert '# TYPE rke2_rollout_phase_duration_seconds gauge' in text
+    assert samples(format_metrics('3', '1700000000', result='failed'))['rke2_rollout_phase_success'] == 0.0
+
+def test_push_url_groups_by_node_and_phase():
+    """Test the grouping key URL, including escaping and validation"""
+    assert push_url('http://10.0.0.1:30091/', 'k2', 'upgrade') == \
+        'http://10.0.0.1:30091/metrics/job/rke2_rollout/node/k2/phase/upgrade'
+    # The Pushgateway needs the @base64 form for values containing a slash
+    assert push_url(' http://gw ', 'a/b', 'join', job='ci') == 'http://gw/metrics/job/ci/node@base64/YS9i/phase/join'
+    assert push_url('http://gw', 'k 2', 'join') == 'http://gw/metrics/job/rke2_rollout/node/k%202/phase/join'
+    with pytest.raises(ValueError):
+        push_url('http://gw', 'k2', 'reboot')
+    with pytest.raises(ValueError):
+        push_url('http://gw', '', 'install')
+
+def test_push_and_cli(pushgateway, capsys):
+    """Test pushing through the API and the command line"""
+    url, pushed = pushgateway
+    assert push(url, 'k1', 'install', 12.5, finished=1700000000) == 200
+    assert main(['--url', url, '--node', 'w1', '--phase', 'join', '--seconds', '40', '--failed']) == 0
+
+    assert [path for path, _ in pushed] == [
+        '/metrics/job/rke2_rollout/node/k1/phase/install',
+        '/metrics/job/rke2_rollout/node/w1/phase/join',
+    ]
+    assert samples(pushed[0][1])['rke2_rollout_phase_duration_seconds'] == 12.5
+    assert samples(pushed[1][1])['rke2_rollout_phase_success'] == 0.0
+    assert 'Pushed join duration of w1' in capsys.readouterr().out
+
+def test_cli_dry_run_and_errors(capsys):
+    """Test that --dry-run only prints and an unreachable Pushgateway exits 1"""
+    assert main(['--url', 'http://gw', '--node', 'k1', '--phase', 'install', '--seconds', '1', '--dry-run']) == 0
+    out = capsys.readouterr().out
+    assert out.startswith('http://gw/metrics/job/rke2_rollout/node/k1/phase/install\n')
+    assert 'rke2_rollout_phase_duration_seconds 1.000' in out
+
+    assert main(['--url', 'http://127.0.0.1:1', '--node', 'k1', '--phase', 'install', '--seconds', '1']) == 1
+    assert 'Error:' in capsys.readouterr().err
+
+def test_monitoring_manifest():
+    """Test that the monitoring manifest scrapes every control plane and its dashboard uses recorded rules"""
+    env = Environment()
+    env.filters['to_nice_json'] = lambda value, indent=4: json.dumps(value, indent=indent, sort_keys=True)
+    hosts = {
+        'groups': {'control_plane_nodes': ['K1', 'k2', 'k3'], 'worker_nodes': ['w1']},
+        'hostvars': {
+            'K1': {'ansible_host': '192.168.1.23'},
+            'k2': {'ansible_host': '192.168.1.24'},
+            'k3': {'ansible_host': '192.168.1.25'},
+            'w1': {'ansible_host': '192.168.1.26'},
+        },
+        'monitoring_namespace': 'monitoring',
+        'prometheus_retention': '15d',
+        'prometheus_storage_size': '50Gi',
+    }
+    with open(os.path.join(REPO_DIR, 'files/monitoring/prometheus-values.yml')) as f:
+        values_text = env.from_string(f.read()).render(**hosts)
+    with open(os.path.join(REPO_DIR, 'files/monitoring/rke2-dashboard.json')) as f:
+        dashboard = json.load(f)
+    with open(os.path.join(ROLE_DIR, 'templates/monitoring.yaml.j2')) as f:
+        manifest = env.from_string(f.read()).render(
+            monitoring_values=values_text,
+            monitoring_dashboard=dashboard,
+            kube_prometheus_stack_version='58.7.2',
+            pushgateway_chart_version='2.14.0',
+            pushgateway_node_port=30091,
+            rke2_ports={'supervisor': 9345},
+            **hosts
+        )
+
+    documents = {
+        (doc['kind'], doc['metadata']['name']): doc
+        for doc in yaml.safe_load_all(manifest) if doc
+    }
+    values = yaml.safe_load(documents[('HelmChart', 'kube-prometheus-stack')]['spec']['valuesContent'])
+    assert values['kubeEtcd']['endpoints'] == ['192.168.1.23', '192.168.1.24', '192.168.1.25']
+    assert values['kubeEtcd']['service']['port'] == 2381
+
+    monitors = {monitor['name']: monitor for monitor in values['prometheus']['additionalServiceMonitors']}
+    assert set(monitors) == {'rke2-supervisor', 'cilium-agent', 'cilium-operator', 'rke2-pushgateway'}
+    assert monitors['rke2-pushgateway']['endpoints'][0]['honorLabels'] is True
+
+    # Every ServiceMonitor outside the Pushgateway chart selects a service in the manifest
+    services = {doc['metadata']['labels']['app.kubernetes.io/name']
+                for (kind, _), doc in documents.items() if kind == 'Service'}
+    for name, monitor in monitors.items():
+        if name != 'rke2-pushgateway':
+            assert monitor['selector']['matchLabels']['app.kubernetes.io/name'] in services
+
+    endpoints = documents[('Endpoints', 'rke2-supervisor')]['subsets'][0]
+    assert [address['nodeName'] for address in endpoints['addresses']] == ['k1', 'k2', 'k3']
+    assert endpoints['ports'][0]['port'] == 9345
+
+    pushgateway = yaml.safe_load(documents[('HelmChart', 'prometheus-pushgateway')]['spec']['valuesContent'])
+    assert pushgateway['service'] == {'type': 'NodePort', 'nodePort': 30091}
+
+    # Dashboard queries on recorded series must have a recording rule
+    recorded = {
+        rule['record']
+        for group in values['additionalPrometheusRulesMap']['rke2-performance']['groups']
+        for rule in group['rules']
+    }
+    assert 'instance:etcd_disk_wal_fsync_duration_seconds:p99' in recorded
+    assert 'verb:apiserver_request_duration_seconds:p99' in recorded
+    configmap = documents[('ConfigMap', 'rke2-rollout-dashboard')]
+    assert configmap['metadata']['labels'] == {'grafana_dashboard': '1'}
+    assert json.loads(configmap['data']['rke2-rollout.json']) == dashboard
+    for panel in dashboard['panels']:
+        for target in panel.get('targets', []):
+            series = target['expr'].split('{')[0].split()[0]
+            assert ':' not in series or series in recorded
@@ -0,0 +1,90 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip('ansible')
+
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+from ansible.plugins.loader import inventory_loader
+
+PLUGIN_DIR = os.path.join(os.path.dirname(__file__), '../plugins/inventory')
+
+HOSTS_TXT = """[vars]
+rke2_version=v1.31.4+rke2r1
+
+[six_node]
+k1 192.168.0.11
+k2 192.168.0.12
+l4 192.168.1.4 agent_mount_device=/dev/sda1
+
+[control_plane_nodes]
+k1
+k2
+
+[worker_nodes]
+l4
+"""
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    monkeypatch.setenv('RKE2_HOSTS_CACHE_DIR', str(tmp_path / 'cache'))
+    inventory_loader.add_directory(PLUGIN_DIR)
+    return inventory_loader.get('rke2_hosts')
+
+@pytest.fixture
+def hosts_file(tmp_path):
+    path = tmp_path / "hosts.txt"
+    path.write_text(HOSTS_TXT)
+    return path
+
+def parse(plugin, path):
+    inventory = InventoryData()
+    plugin.parse(inventory, DataLoader(), str(path), cache=False)
+    return inventory
+
+def test_verify_file(plugin, hosts_file, tmp_path):
+    """Test that only hosts.txt files are claimed"""
+    other = tmp_path / "rke2.yml"
+    other.write_text("all: {}")
+    assert plugin.verify_file(str(hosts_file))
+    assert not plugin.verify_file(str(other))
+
+def test_parse_hosts_txt(plugin, hosts_file):
+    """Test groups, hosts and vars built from hosts.txt"""
+    inventory = parse(plugin, hosts_file)
+
+    assert {h.name for h in inventory.groups['control_plane_nodes'].hosts} == {'k1', 'k2'}
+    assert 'worker_nodes' in [g.name for g in inventory.groups['six_node_cluster'].child_groups]
+    assert inventory.hosts['l4'].vars['ansible_host'] == '192.168.1.4'
+    assert inventory.hosts['l4'].vars['mounts']['agent']['device'] == '/dev/sda1'
+    assert inventory.groups['all'].vars['rke2_version'] == 'v1.31.4+rke2r1'
+    assert inventory.groups['all'].vars['ansible_user'] == 'ubuntu'
+
+def test_parse_uses_hash_cache(plugin, hosts_file, tmp_path, monkeypatch):
+    """Test that results are cached by content and parser hash"""
+    plugin_module = sys.modules[type(plugin).__module__]
+    parse(plugin, hosts_file)
+    cache_files = os.listdir(tmp_path / 'cache')
+    assert len(cache_files) == 1
+
+    # Same content, second parse comes from the cache without running the parser
+    def fail(lines):
+        raise AssertionError("parser ran although the cache was valid")
+
+    with monkeypatch.context() as m:
+        m.setattr(plugin_module, 'generate_inventory_from_lines', fail)
+        inventory = parse(plugin, hosts_file)
+    assert inventory.hosts['l4'].vars['ansible_host'] == '192.168.1.4'
+    assert os.listdir(tmp_path / 'cache') == cache_files
+
+    # A changed parser gets a new cache entry
+    monkeypatch.setattr(plugin_module, 'PARSER_DIGEST', 'changed')
+    parse(plugin, hosts_file)
+    assert len(os.listdir(tmp_path / 'cache')) == 2
+
+    # Changed content gets a new cache entry
+    hosts_file.write_text(HOSTS_TXT.replace('192.168.1.4', '192.168.1.5'))
+    inventory = parse(plugin, hosts_file)
+    assert inventory.hosts['l4'].vars['ansible_host'] == '192.168.1.5'
+    assert len(os.listdir(tmp_path / 'cache')) == 3
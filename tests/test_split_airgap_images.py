@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import tarfile
+import pytest
+from scripts.split_airgap_images import (
+    image_file_name,
+    image_roles,
+    parse_args,
+    split_archive
+)
+
+def add_bytes(archive, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    archive.addfile(info, io.BytesIO(data))
+
+@pytest.fixture
+def image_archive(tmp_path):
+    """Build a small docker-save style archive with two images sharing a layer"""
+    manifest = [
+        {
+            'Config': 'etcdcfg.json',
+            'RepoTags': ['docker.io/rancher/hardened-etcd:v3.5.16-k3s1-build20241106'],
+            'Layers': ['base/layer.tar', 'etcd/layer.tar']
+        },
+        {
+            'Config': 'pausecfg.json',
+            'RepoTags': ['docker.io/rancher/mirrored-pause:3.6'],
+            'Layers': ['base/layer.tar', 'pause/layer.tar']
+        }
+    ]
+    path = tmp_path / "rke2-images.linux-amd64.tar"
+    with tarfile.open(path, 'w') as archive:
+        for layer in ('base', 'etcd', 'pause'):
+            add_bytes(archive, f'{layer}/VERSION', b'1.0')
+            add_bytes(archive, f'{layer}/layer.tar', layer.encode() * 100)
+        add_bytes(archive, 'etcdcfg.json', b'{}')
+        add_bytes(archive, 'pausecfg.json', b'{}')
+        add_bytes(archive, 'manifest.json', json.dumps(manifest).encode())
+    return path
+
+def test_image_file_name():
+    """Test archive naming from repo tags"""
+    assert image_file_name(['docker.io/rancher/mirrored-pause:3.6'], 0) == 'rancher-mirrored-pause-3.6'
+    assert image_file_name(['rancher/rke2-runtime:v1.31.4-rke2r1'], 1) == 'rancher-rke2-runtime-v1.31.4-rke2r1'
+    assert image_file_name([], 7) == 'image-007'
+
+def test_image_roles():
+    """Test role assignment by pattern"""
+    assert image_roles(['rancher/hardened-etcd:v3.5'], ['hardened-etcd']) == ['control_plane']
+    assert image_roles(['rancher/mirrored-pause:3.6'], ['hardened-etcd']) == ['control_plane', 'worker']
+
+def test_control_plane_only_patterns():
+    """Test that --no-control-plane-only replaces the default pattern list"""
+    assert parse_args(['a.tar', '-o', 'out']).control_plane_only is None
+    assert parse_args(['a.tar', '-o', 'out', '--no-control-plane-only']).control_plane_only == []
+    args = parse_args(['a.tar', '-o', 'out', '--no-control-plane-only', '--control-plane-only', 'kube-apiserver'])
+    assert args.control_plane_only == ['kube-apiserver']
+    assert image_roles(['rancher/hardened-etcd:v3.5'], []) == ['control_plane', 'worker']
+
+def test_split_archive(image_archive, tmp_path):
+    """Test splitting into per-image archives with an index"""
+    output = tmp_path / "split"
+    index = split_archive(str(image_archive), str(output), compress_output=False)
+
+    assert [image['file'] for image in index['images']] == [
+        'rancher-hardened-etcd-v3.5.16-k3s1-build20241106.tar',
+        'rancher-mirrored-pause-3.6.tar'
+    ]
+    assert index['images'][0]['roles'] == ['control_plane']
+    assert index['images'][1]['roles'] == ['control_plane', 'worker']
+    with open(output / 'index.json') as f:
+        assert json.load(f) == index
+
+    with tarfile.open(output / 'rancher-mirrored-pause-3.6.tar') as archive:
+        names = set(archive.getnames())
+        manifest = json.load(archive.extractfile('manifest.json'))
+    assert names == {'base/VERSION', 'base/layer.tar', 'pause/VERSION', 'pause/layer.tar', 'pausecfg.json', 'manifest.json'}
+    assert manifest[0]['RepoTags'] == ['docker.io/rancher/mirrored-pause:3.6']
+
+def test_split_archive_requires_manifest(tmp_path):
+    """Test that non docker-save archives are rejected"""
+    path = tmp_path / "bad.tar"
+    with tarfile.open(path, 'w') as archive:
+        add_bytes(archive, 'index.json', b'{}')
+    with pytest.raises(ValueError, match="manifest.json"):
+        split_archive(str(path), str(tmp_path / "out"), compress_output=False)